@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+# default memory limit of a block cache in bytes
+BLOCK_CACHE_SIZE = 256 * 1024 * 1024
+# default number of scans per cached block
+BLOCK_SCANS = 65536
+
+
+class BlockCache:
+    """Memory limited cache of decoded blocks of ADC data. \n
+    The ADC data of a file is split into blocks of 'block_scans' scans
+    (one data point of every acquired channel). Each block is decoded
+    for all channels at once and kept until the cache exceeds
+    'max_bytes', at which point the least recently used blocks are
+    dropped. \n
+    One cache can be shared by many CODASReader objects (also from
+    several threads) by passing it as 'block_cache' argument or with
+    CODASReader.setBlockCache, so repeated and overlapping reads of
+    the same files are only decoded once. \n
+    param max_bytes : int, optional \n
+        Maximum memory used by the cached blocks (default: 256 MB) \n
+    param block_scans : int, optional \n
+        Number of scans per block (default: 65536)"""
+
+    def __init__(self, max_bytes=BLOCK_CACHE_SIZE, block_scans=BLOCK_SCANS):
+        if block_scans < 1:
+            raise ValueError("block_scans must be at least 1")
+        self.max_bytes = max_bytes
+        self.block_scans = block_scans
+        self._blocks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # returns the block stored under 'key' or None.
+    # The block must not be changed by the caller
+    def get(self, key):
+        """Returns the cached block for 'key' or None"""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    # stores 'block' (numpy array) under 'key' and drops the least
+    # recently used blocks until the cache fits into max_bytes.
+    # Blocks larger than max_bytes are not stored
+    def put(self, key, block):
+        """Stores the decoded block under 'key'"""
+        if block.nbytes > self.max_bytes:
+            return
+        block.flags.writeable = False
+        with self._lock:
+            if key in self._blocks:
+                self._bytes -= self._blocks.pop(key).nbytes
+            self._blocks[key] = block
+            self._bytes += block.nbytes
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._blocks.popitem(last=False)[1].nbytes
+                self.evictions += 1
+
+    # drops all cached blocks
+    def clear(self):
+        """Removes all blocks from the cache"""
+        with self._lock:
+            self._blocks.clear()
+            self._bytes = 0
+
+    # returns the number of hits, misses, evictions and the memory used
+    def getStats(self):
+        """Returns a dictionary with the cache statistics"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / requests if requests else 0.0,
+                    "evictions": self.evictions,
+                    "blocks": len(self._blocks), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes,
+                    "block_scans": self.block_scans}
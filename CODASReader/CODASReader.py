@@ -1,6 +1,168 @@
+import io
+import itertools
+import os
 import struct
+import threading
 import time
-import numpy as np
+from collections import namedtuple
+try:
+    from .CompressedFile import CompressedFile, getCompression
+except ImportError:
+    # running this file directly from the command line
+    from CompressedFile import CompressedFile, getCompression
+
+# numpy is only imported once ADC data is actually touched (see readADC)
+# so that reading header information stays fast for scripts that poll
+# large numbers of files
+
+# number of bytes read from the start of the file when reading the header.
+# This covers the header of files with up to 29 channels in a single read,
+# larger headers are read again with their full length
+HEADER_READ_SIZE = 1156
+# number of scans (one data point of every acquired channel) that are
+# read and translated at once when reading ADC data
+ADC_CHUNK_SCANS = 65536
+# windows read by CODASReader.readWindows that are less than this many
+# bytes apart are read together, since reading the bytes in between is
+# faster than a separate read
+WINDOW_MERGE_BYTES = 256 * 1024
+
+# numbers identifying file objects in the block cache. id() cannot be
+# used since it is given to a new object once the old one is deleted
+_object_numbers = itertools.count()
+
+# ADC data returned by CODASReader.getADC, the fields correspond to the
+# attributes of the same name set by CODASReader.readADC.
+# adc_time_stamps and adc_flags are None unless they were requested
+ADCWindow = namedtuple("ADCWindow", ["adc_data", "adc_time_stamps",
+                                     "adc_scaling", "channels",
+                                     "adc_flags"], defaults=[None])
+
+
+# creates the date, time and running timer of 'scans' scans starting at
+# scan 'first', for data that starts 'start_time' seconds after
+# 'acq_time' (seconds since epoch) with 'time_between_samples' seconds
+# between scans
+def createTimeStamps(acq_time, start_time, first, scans,
+                     time_between_samples, az_time=True):
+    """Returns an array of time stamps (date, time, running timer)"""
+    import numpy as np
+    # applying a 7 hour offset if az_time is True to account for
+    # the 7 hour difference between arizona time and UTC
+    if az_time:
+        offset = -3600 * 7
+    else:
+        offset = 0
+    time_stamps = np.empty([scans, 3], dtype="U20")
+    samples = np.arange(first, first + scans)
+    # Only full seconds are shown, so each second only has to be
+    # converted to a string once
+    seconds, second_index = np.unique(np.floor(
+        acq_time + start_time + samples * time_between_samples
+        + offset).astype(np.int64), return_inverse=True)
+    time_stamps[:, 0] = np.array([time.strftime(
+        "%m-%d-%Y", time.gmtime(second)) for second in seconds],
+        dtype="U20")[second_index]
+    time_stamps[:, 1] = np.array([time.strftime(
+        "%H:%M:%S", time.gmtime(second)) for second in seconds],
+        dtype="U20")[second_index]
+    time_stamps[:, 2] = np.char.mod("%.4f", samples * time_between_samples)
+    return time_stamps
+
+
+# returns an uninitialised array of 'shape' and 'dtype'.
+# If 'on_disk' is True, the array is memory mapped to an anonymous
+# temporary file in 'scratch_dir' instead of being held in memory.
+# The file is deleted by the system once the array is no longer used
+def allocateArray(shape, dtype, on_disk=False, scratch_dir=None):
+    """Returns an empty array in memory or memory mapped to a
+    temporary file"""
+    import numpy as np
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape)) * dtype.itemsize
+    if not on_disk or size == 0:
+        return np.empty(shape, dtype=dtype)
+    # tempfile is only imported here, importing it takes longer than
+    # reading a header
+    import tempfile
+    with tempfile.TemporaryFile(prefix="codas-", dir=scratch_dir) as file:
+        file.truncate(size)
+        return np.memmap(file, dtype=dtype, mode="w+", shape=tuple(shape))
+
+
+# returns the number of scans that can be exported at once within
+# 'max_memory' bytes, where each scan of 'channels' of the
+# 'acq_channels' acquired channels is decoded and written as text (CSV)
+# or binary data of 'dtype'
+def getChunkScans(max_memory, channels, acq_channels, output_format="csv",
+                  dtype="int16"):
+    """Returns the number of scans per chunk that fits into max_memory"""
+    if max_memory is None:
+        return ADC_CHUNK_SCANS
+    # the raw bytes and the decoded int16 data of all acquired channels,
+    # since the selected channels are taken from the decoded scans
+    bytes_per_scan = 4 * acq_channels
+    # the selected channels and temporary copies while scaling them
+    bytes_per_scan += 8 * channels + 16
+    if output_format == "csv":
+        # time stamps, the text of each line and the python strings of
+        # every value while they are joined
+        bytes_per_scan += 240 + 100 * (channels + 3)
+    elif dtype == "float32":
+        # scaled float64 data, its float32 copy and the output bytes,
+        # which are held until the next chunk is converted
+        bytes_per_scan += 20 * channels
+    else:
+        # the little endian copy and the output bytes
+        bytes_per_scan += 6 * channels
+    return max(1, min(ADC_CHUNK_SCANS, int(max_memory / bytes_per_scan)))
+
+
+# writes the three header lines of the CSV format described in
+# CODASReader.saveADCsToCSV to the open text file 'file'
+def writeCSVHeader(file, delim, header, channels, adc_scaling):
+    """Writes the custom header, channel numbers and scaling factors"""
+    # writing header at the top of the file if a header is given
+    file.write("#")
+    for item in header:
+        file.write(str(item))
+        file.write(delim)
+    file.write("\n")
+    # writing channel number for each column at the top of each
+    # column
+    file.write("#")
+    file.write(delim)
+    for item in channels:
+        file.write(str(item))
+        file.write(delim)
+    file.write("\n")
+    # writing the scaling factors at the top of the file
+    # scaling information for each channel will be the second
+    # item in the column corresponding to that channel after
+    # the channel number
+    file.write("#")
+    file.write(delim)
+    for item in adc_scaling:
+        file.write(str(item))
+        file.write(delim)
+    file.write("\n")
+
+
+# writes adc data and time stamps as lines of the CSV format described in
+# CODASReader.saveADCsToCSV to the open text file 'file'.
+# Can be called repeatedly to write the data in chunks
+def writeCSVRows(file, delim, adc_data, adc_time_stamps):
+    """Writes one line per row of 'adc_data' with its time stamps"""
+    if len(adc_data) == 0:
+        return
+    # each line consists of the running timer, the data of all channels,
+    # the date and the time
+    columns = ([adc_time_stamps[:, 2]]
+               + [adc_data[:, k].astype(str)
+                  for k in range(adc_data.shape[1])]
+               + [adc_time_stamps[:, 0], adc_time_stamps[:, 1]])
+    file.write("\n".join(delim.join(line) for line in zip(*columns)))
+    file.write("\n")
 
 
 class CODASReader:
@@ -13,41 +175,191 @@ class CODASReader:
     It is recommended not to change this as the header must be read
     before any other part of the file can be processed."""
 
-    location = ""
-    bytes_in_file = 0
-    channels = []
-    header = []
-    adc_data = []
-    adc_time_stamps = []
-    adc_scaling = []
-    trailer = []
-    packed = False
-    hiRes = False
-    acq_channels = 0
-    adc_data_bytes = 0
-
-    def __init__(self, location, read_header=True):
+    def __init__(self, location, read_header=True, block_cache=None):
         self.location = location
-        bin_data = open(self.location, "rb")
-        # determining total length of file in bytes
-        bin_data.seek(0, 2)
-        self.bytes_in_file = bin_data.tell()
-        bin_data.seek(0, 0)
-        bin_data.close()
+        # cache of decoded blocks of ADC data, see BlockCache
+        self.block_cache = block_cache
+        self.bytes_in_file = 0
+        self.channels = []
+        self.header = []
+        self.adc_data = []
+        self.adc_time_stamps = []
+        self.adc_scaling = []
+        # flag bits of the adc data, only set by readADC with flags=True
+        self.adc_flags = None
+        self.trailer = []
+        self.packed = False
+        self.hiRes = False
+        self.acq_channels = 0
+        self.adc_data_bytes = 0
+        # file object all data is read from. This stays None for
+        # uncompressed files given by their location, which are read
+        # through a file descriptor
+        self._source = None
+        self._close_source = False
+        # index of seek points of a compressed file that was closed, so
+        # it does not have to be built again when the file is reopened
+        self._compressed_index = None
+        # file descriptor kept open between 'open' and 'close'.
+        # If it is None, the file is opened for every read
+        self._file_descriptor = None
+        # lock for file objects and systems without os.pread, where
+        # seeking and reading must happen together
+        self._lock = threading.Lock()
+        if hasattr(location, "read"):
+            # determining total length of file object in bytes
+            self._source = location
+            self._source.seek(0, 2)
+            self.bytes_in_file = self._source.tell()
+            self._source.seek(0, 0)
+            first_bytes = self._source.read(HEADER_READ_SIZE)
+            # identifies the file in the block cache, blocks of one
+            # file object are never used for another
+            self._cache_key = ("object", next(_object_numbers))
+        else:
+            # determining total length of file in bytes, the beginning
+            # of the file is read in the same go for the header
+            with open(self.location, "rb") as bin_data:
+                file_status = os.fstat(bin_data.fileno())
+                self.bytes_in_file = file_status.st_size
+                first_bytes = bin_data.read(HEADER_READ_SIZE)
+            self._cache_key = (os.path.abspath(self.location),
+                               file_status.st_size, file_status.st_mtime_ns)
+        # compressed files are read through a CompressedFile, which
+        # only decompresses the parts of the file that are read
+        if getCompression(first_bytes[:4]) is not None:
+            self._source = CompressedFile(location)
+            self._close_source = True
+            self.bytes_in_file = self._source.size
+            # the header has to be read from the decompressed data
+            first_bytes = None
         if read_header:
-            self.readHeader()
+            self.readHeader(first_bytes)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # keeps the file open until 'close' is called, so that reads do not
+    # have to open the file again.
+    # With the file open, all reads are positional (os.pread) and
+    # can be done from several threads at once
+    def open(self):
+        """Keeps the file open for all following reads until 'close'
+        is called. \n
+        This is done automatically when the reader is used as context
+        manager (with CODASReader(location) as reader: ...)."""
+        if self._close_source:
+            self._getCompressedFile()
+        elif self._source is None and self._file_descriptor is None:
+            self._file_descriptor = os.open(
+                self.location, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+
+    # closes the file kept open by 'open' and any compressed file
+    # opened by this reader. Data that was already read stays available
+    # and the reader can still be used, compressed files are then opened
+    # again by the next read
+    def close(self):
+        """Closes the file. Data that was already read stays
+        available."""
+        if self._file_descriptor is not None:
+            os.close(self._file_descriptor)
+            self._file_descriptor = None
+        if self._close_source and self._source is not None:
+            self._compressed_index = self._source.getIndex()
+            self._source.close()
+            self._source = None
+
+    # returns the CompressedFile of a compressed file, opening it again
+    # if it was closed by 'close'
+    def _getCompressedFile(self):
+        """Returns the open CompressedFile of this reader"""
+        with self._lock:
+            if self._source is None:
+                self._source = CompressedFile(self.location,
+                                              index=self._compressed_index)
+            return self._source
+
+    # reads 'length' bytes from the file starting at byte 'offset'.
+    # less bytes than requested are returned if the end of the file
+    # is reached.
+    # Reads neither depend on nor change a shared file position, so they
+    # can be done from several threads at once
+    def _readBytes(self, offset, length):
+        """Returns 'length' bytes of the file starting at byte 'offset'"""
+        if self._close_source:
+            return self._getCompressedFile().readAt(offset, length)
+        if self._source is not None:
+            with self._lock:
+                self._source.seek(offset, 0)
+                return self._source.read(length)
+        if self._file_descriptor is None:
+            with open(self.location, "rb") as bin_data:
+                bin_data.seek(offset, 0)
+                return bin_data.read(length)
+        if not hasattr(os, "pread"):
+            with self._lock:
+                os.lseek(self._file_descriptor, offset, 0)
+                return self._readAll(
+                    lambda size, position: os.read(self._file_descriptor,
+                                                   size),
+                    offset, length)
+        return self._readAll(
+            lambda size, position: os.pread(self._file_descriptor,
+                                            size, position),
+            offset, length)
+
+    # calls 'read' until 'length' bytes are read or the end of the file
+    # is reached, since a single read may return less bytes
+    def _readAll(self, read, offset, length):
+        """Returns 'length' bytes read with the function 'read'"""
+        parts = []
+        while length > 0:
+            part = read(length, offset)
+            if not part:
+                break
+            parts.append(part)
+            offset += len(part)
+            length -= len(part)
+        return b"".join(parts)
 
     # reads header of the file. This is done automatically when creating
     # a new CODASReader object by default.
     # must be run before reading the rest of the file.
-    def readHeader(self):
+    def readHeader(self, bin_data=None):
         """Reads the header of the file. \n
         This is done automatically by default when creating a new
         CODASReader object. \n
         The header must be read before any other part of the file can
-        be read."""
-        bin_data = open(self.location, "rb")
-        bin_data.seek(0, 0)
+        be read. \n
+        param bin_data : bytes, optional \n
+            The first bytes of the file if they were already read,
+            otherwise they are read from the file"""
+        # reading the beginning of the file in one go, the header is
+        # then translated from memory
+        # bytes 6 - 7 store the total number of bytes in the header,
+        # if the header is longer than the bytes read it is read again
+        # with its full length
+        if bin_data is None:
+            bin_data = self._readBytes(0, HEADER_READ_SIZE)
+        if len(bin_data) >= 8:
+            header_length = struct.unpack_from("<h", bin_data, 6)[0]
+            if header_length > len(bin_data):
+                bin_data = self._readBytes(0, header_length)
+        try:
+            self._translateHeader(bin_data)
+        except struct.error:
+            raise(ValueError("File may be truncated or corrupted: "
+                             + "Header is shorter than expected\n"))
+
+    # translates the header stored in the bytes object 'bin_data'
+    def _translateHeader(self, bin_data):
+        """Translates the file header from the bytes 'bin_data'"""
+        # position of the next element to be read in bin_data
+        position = 0
 
         # format strings for first 33 elements of header,
         # all formats are standart size little endian
@@ -73,8 +385,8 @@ class CODASReader:
 
         # reads and converts the first 33 elements of the file header
         for i, form in enumerate(formats):
-            self.header.append(struct.unpack(
-                form, bin_data.read(struct.calcsize(form))))
+            self.header.append(struct.unpack_from(form, bin_data, position))
+            position += struct.calcsize(form)
             # reducing 1 element tuples to single element
             if len(self.header[-1]) == 1:
                 self.header[-1] = self.header[-1][0]
@@ -94,8 +406,9 @@ class CODASReader:
             channel_info = []
             # creates the substructure of element 34
             for k, form in enumerate(channel_format):
-                channel_info.append(struct.unpack(
-                    form, bin_data.read(struct.calcsize(form))))
+                channel_info.append(
+                    struct.unpack_from(form, bin_data, position))
+                position += struct.calcsize(form)
                 # reducing 1 element tuples to single element
                 if len(channel_info[-1]) == 1:
                     channel_info[-1] = channel_info[-1][0]
@@ -108,8 +421,7 @@ class CODASReader:
             self.header.append(channel_info)
 
         # reading and converting last header element
-        self.header.append(struct.unpack(
-            "<H", bin_data.read(struct.calcsize("<H")))[0])
+        self.header.append(struct.unpack_from("<H", bin_data, position)[0])
         # if control byte of header does not match the expected value
         # raise an error and the recorded control byte
         if self.header[-1] != 32769:
@@ -150,8 +462,6 @@ class CODASReader:
         if int(self.header[26][14]) == 1:
             self.hiRes = True
 
-        bin_data.close
-
     # reads ADC data from file.
     # takes a list of channel or a single channel number as optional
     # argument so it only reads the data for those channels.
@@ -162,7 +472,8 @@ class CODASReader:
     # to all values and saved or whether it is simply stored once to
     # then manually be applied later
     def readADC(self, channels=None, start_time=0, end_time=None,
-                save_memory=True, az_time=True):
+                save_memory=True, az_time=True, max_memory=None,
+                scratch_dir=None, flags=False):
         """PARAMETERS: \n
         channels : int or array-like of int, optional \n
             Must be able to be converted into a numpy array. \n
@@ -194,121 +505,527 @@ class CODASReader:
             Decides whether the time stamps are in UTC or in
             Arizona local time (VERITAS telescope location) \n
             Default is True (Arizona time) \n
+        max_memory : int, optional \n
+            Maximum number of bytes the ADC data and time stamps may
+            take up in memory. If they would take up more, they are
+            stored in memory mapped temporary files in 'scratch_dir'
+            instead, which are deleted automatically once the arrays
+            are no longer used. \n
+            Default is None (no limit) \n
+        scratch_dir : str, optional \n
+            Directory for the temporary files used when 'max_memory'
+            is exceeded. \n
+            Default is the system's temporary directory \n
+        flags : bool, optional \n
+            Decides whether the flag bits D0 and D1 of every data point
+            are extracted as well and saved to the adc_flags array in
+            this object, see 'readFlags'. Only possible for files that
+            are not hiRes. \n
+            Default is False \n
         \n Use 'printAcqTime' and 'printFinishTime' to get start and
         finish time of the data acquesition respectively
         \n The header of the file must be read before
         reading the ADC data.
         \n This method reads the ADC data from the file and saves the
         translated data to the adc_data array in this object. """
+        adc_window = self.getADC(channels, start_time, end_time,
+                                 save_memory, az_time, time_stamps=True,
+                                 max_memory=max_memory,
+                                 scratch_dir=scratch_dir, flags=flags)
+        self.adc_data = adc_window.adc_data
+        self.adc_flags = adc_window.adc_flags
+        self.adc_time_stamps = adc_window.adc_time_stamps
+        self.adc_scaling = adc_window.adc_scaling
+        # saving channels numbers
+        self.channels = adc_window.channels
+
+    # returns ADC data from the file without storing it in this object.
+    # takes the same arguments as readADC.
+    # Since nothing in this object is changed, it can be called from
+    # several threads at once
+    def getADC(self, channels=None, start_time=0, end_time=None,
+               save_memory=True, az_time=True, time_stamps=False,
+               max_memory=None, scratch_dir=None, flags=False):
+        """PARAMETERS: \n
+        channels, start_time, end_time, save_memory, az_time : optional \n
+            See 'readADC' \n
+        max_memory, scratch_dir, flags : optional \n
+            See 'readADC' \n
+        time_stamps : bool, optional \n
+            Decides whether the date, time and running timer of each
+            data point are created as well. \n
+            Default is False \n
+        \n Returns an ADCWindow with the fields adc_data,
+        adc_time_stamps (None if time_stamps is False), adc_scaling,
+        channels and adc_flags (None if flags is False), which
+        correspond to the attributes set by 'readADC'.
+        \n Use this instead of 'readADC' to read from several threads at
+        once, ideally with the file kept open
+        (with CODASReader(location) as reader: ...)."""
+        import numpy as np
         # raise error if header list is empty
         if len(self.header) == 0:
             raise RuntimeError("Header has not been read or is empty"
                                + "Use 'readHeader' to read header")
+        channels = self._getChannels(channels)
+        start_byte, scans = self._getScanRange(start_time, end_time)
+        if flags:
+            self._checkFlags()
+
+        # setting up adc data array based on whether save_memory is
+        # set to true or not
+        if save_memory:
+            dtype = np.dtype(np.int16)
+        else:
+            dtype = np.dtype(np.float64)
+        # the arrays are stored on disk if they would take up more
+        # memory than max_memory
+        total_bytes = scans * len(channels) * dtype.itemsize
+        if time_stamps:
+            total_bytes += scans * np.dtype("U20").itemsize * 3
+        if flags:
+            total_bytes += scans * len(channels)
+        on_disk = max_memory is not None and total_bytes > max_memory
+        adc_data = allocateArray([scans, len(channels)], dtype, on_disk,
+                                 scratch_dir)
+        adc_flags = None
+        if flags:
+            adc_flags = allocateArray([scans, len(channels)], np.uint8,
+                                      on_disk, scratch_dir)
+        # creating the adc data from the main body of the binary file
+        self._decodeADC(start_byte, scans, channels, adc_data, save_memory,
+                        adc_flags)
+        # setting up arrays to store the time stamps and the scaling
+        # factor for each channel.
+        # these are stored separately to increase memory efficiency on
+        # the main data
+        adc_time_stamps = None
+        if time_stamps:
+            adc_time_stamps = allocateArray([scans, 3], "U20", on_disk,
+                                            scratch_dir)
+            # appending date and time to the time stamps in chunks
+            for i in range(0, scans, ADC_CHUNK_SCANS):
+                adc_time_stamps[i:i + ADC_CHUNK_SCANS] = self._getTimeStamps(
+                    start_time, i, min(ADC_CHUNK_SCANS, scans - i), az_time)
+        # if save_memory is set to true, scaling factors will be saved
+        # in a separate list, otherwise they are already applied
+        if save_memory:
+            adc_scaling = np.array([self.header[33 + channel][2]
+                                    for channel in channels], dtype=float)
+        else:
+            adc_scaling = np.ones(len(channels))
+        return ADCWindow(adc_data, adc_time_stamps, adc_scaling, channels,
+                         adc_flags)
+
+    # reads ADC data from the file directly into shared memory so it can
+    # be used by several processes without copying it.
+    # takes the same channels, time frame and save_memory arguments as
+    # readADC but returns a handle to the data instead of storing it in
+    # this object
+    def readADCShared(self, channels=None, start_time=0, end_time=None,
+                      save_memory=True, backend="shm", directory=None):
+        """PARAMETERS: \n
+        channels, start_time, end_time, save_memory : optional \n
+            See 'readADC' \n
+        backend : str, optional \n
+            'shm' to store the data in multiprocessing.shared_memory,
+            'memmap' to store it in a memory mapped temporary file. \n
+            Default is 'shm' \n
+        directory : str, optional \n
+            Directory of the temporary file for the 'memmap' backend. \n
+            Default is the system's temporary directory. \n
+        \n Reads the ADC data and returns a SharedADC handle to it.
+        The handle can be passed to other processes which attach to
+        the data without copying it. It carries the channel numbers,
+        the scaling factors and the time base of the data. \n
+        The calling process owns the data and must call 'unlink' on the
+        handle (or use it as context manager) once it is no longer
+        needed. No time stamps are created and the data is not stored
+        in this object."""
+        import numpy as np
+        from .SharedADC import SharedADC
+        # raise error if header list is empty
+        if len(self.header) == 0:
+            raise RuntimeError("Header has not been read or is empty"
+                               + "Use 'readHeader' to read header")
+        channels = self._getChannels(channels)
+        start_byte, scans = self._getScanRange(start_time, end_time)
+        if save_memory:
+            dtype = np.int16
+            adc_scaling = [self.header[33 + channel][2]
+                           for channel in channels]
+        else:
+            dtype = np.float64
+            adc_scaling = [1.0] * len(channels)
+        handle = SharedADC.create(
+            [scans, len(channels)], dtype, channels.tolist(), adc_scaling,
+            start_time, self.header[12], self.header[13], backend=backend,
+            directory=directory)
+        try:
+            self._decodeADC(start_byte, scans, channels, handle.attach(),
+                            save_memory)
+        except BaseException:
+            try:
+                handle.unlink()
+            except BufferError:
+                # the traceback still holds the array, the shared memory
+                # is freed once it is released
+                pass
+            raise
+        return handle
+
+    # reads short windows of ADC data around many points in time at once.
+    # The windows are sorted and windows close to each other are read
+    # and decoded together, so each part of the file is read only once
+    def readWindows(self, times, pre, post, channels=None, save_memory=True,
+                    pad_value=0, merge_bytes=WINDOW_MERGE_BYTES):
+        """PARAMETERS: \n
+        times : float or array-like of float \n
+            Centres of the windows in seconds since start of data
+            acquesition, in any order \n
+        pre, post : float \n
+            Time in seconds read before and after each centre \n
+        channels, save_memory : optional \n
+            See 'readADC' \n
+        pad_value : int or float, optional \n
+            Value of the data points of windows that reach past the
+            start or end of the ADC data. \n
+            Default is 0 \n
+        merge_bytes : int, optional \n
+            Windows less than this many bytes apart in the file are
+            read together. Default is 256 kB \n
+        \n Returns an array of shape (number of windows, samples,
+        channels) with the windows in the order of 'times'. Each window
+        starts 'pre' seconds before the scan closest to its centre and
+        ends 'post' seconds after it, so all windows contain
+        round(pre / time between samples) + 1
+        + round(post / time between samples) scans. \n
+        The data is not stored in this object, so this can be called
+        from several threads at once. Keeping the file open (see
+        'open') avoids opening it again for every merged read."""
+        import numpy as np
+        # raise error if header list is empty
+        if len(self.header) == 0:
+            raise RuntimeError("Header has not been read or is empty"
+                               + "Use 'readHeader' to read header")
+        if pre < 0 or post < 0:
+            raise ValueError("pre and post must not be negative")
+        channels = self._getChannels(channels)
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        # self.header[12] stores the time between samples
+        pre_scans = int(round(pre / self.header[12]))
+        samples = pre_scans + 1 + int(round(post / self.header[12]))
+        first_scans = (np.rint(times / self.header[12]).astype(np.int64)
+                       - pre_scans)
+        if save_memory:
+            dtype = np.int16
+            scaling = 1
+        else:
+            dtype = np.float64
+            scaling = np.array([self.header[33 + channel][2]
+                                for channel in channels])
+        windows = np.full([len(times), samples, len(channels)], pad_value,
+                          dtype=dtype)
+        total_scans = self._getScanCount()
+        # range of scans of each window that lies within the ADC data
+        starts = np.clip(first_scans, 0, total_scans)
+        ends = np.clip(first_scans + samples, 0, total_scans)
+        order = np.argsort(starts, kind="stable")
+        order = order[ends[order] > starts[order]]
+        if len(order) == 0:
+            return windows
+        # windows are put into groups that are read at once as long as
+        # the gap to the previous window is small and the group does
+        # not grow much larger than a chunk of ADC_CHUNK_SCANS scans
+        gap_scans = merge_bytes // (2 * self.acq_channels)
+        max_group_scans = max(ADC_CHUNK_SCANS, samples)
+        group_ends = np.maximum.accumulate(ends[order])
+        groups = [0]
+        group_start = starts[order[0]]
+        for i in range(1, len(order)):
+            if (starts[order[i]] > group_ends[i - 1] + gap_scans
+                    or group_ends[i] - group_start > max_group_scans):
+                groups.append(i)
+                group_start = starts[order[i]]
+        groups.append(len(order))
+        offsets = np.arange(samples)
+        for group_first, group_last in zip(groups[:-1], groups[1:]):
+            group = order[group_first:group_last]
+            group_start = int(starts[group[0]])
+            group_scans = int(group_ends[group_last - 1]) - group_start
+            group_data = self._readScans(group_start, group_scans, channels)
+            # picking the scans of all windows of the group at once,
+            # scans outside of the ADC data are replaced by pad_value
+            scans = first_scans[group][:, None] + offsets
+            inside = (scans >= 0) & (scans < total_scans)
+            window_data = group_data[np.clip(scans - group_start, 0,
+                                             group_scans - 1)]
+            windows[group] = np.where(inside[:, :, None],
+                                      window_data * scaling, pad_value)
+        return windows
+
+    # reads only the flag bits D0 and D1 of the data points of the given
+    # channels. In files that are not hiRes these bits are not part of
+    # the 14 bit data value, WinDaq uses them for flags such as digital
+    # inputs and event markers
+    def readFlags(self, channels=None, start_time=0, end_time=None):
+        """PARAMETERS: \n
+        channels, start_time, end_time : optional \n
+            See 'readADC' \n
+        \n Returns a uint8 array with one row per scan and one column
+        per channel, in which bit 0 is the flag bit D0 and bit 1 the
+        flag bit D1 of each data point. \n
+        The flags can also be read together with the ADC data with
+        readADC(flags=True). Raises ValueError for hiRes files, in
+        which D0 and D1 are data bits. The flags are not stored in
+        this object."""
+        import numpy as np
+        # raise error if header list is empty
+        if len(self.header) == 0:
+            raise RuntimeError("Header has not been read or is empty"
+                               + "Use 'readHeader' to read header")
+        self._checkFlags()
+        channels = self._getChannels(channels)
+        start_byte, scans = self._getScanRange(start_time, end_time)
+        adc_flags = np.empty([scans, len(channels)], dtype=np.uint8)
+        self._decodeADC(start_byte, scans, channels, None,
+                        flags_out=adc_flags)
+        return adc_flags
+
+    # returns the scans at which a flag bit changes its state, e.g. to
+    # find hardware triggers recorded on a digital input
+    def getFlagChanges(self, bit=0, channels=None, start_time=0,
+                       end_time=None, adc_flags=None):
+        """PARAMETERS: \n
+        bit : int, optional \n
+            0 for flag bit D0, 1 for flag bit D1. Default is 0 \n
+        channels, start_time, end_time : optional \n
+            See 'readADC' \n
+        adc_flags : numpy array, optional \n
+            Flags returned by 'readFlags' or stored in adc_flags by
+            readADC(flags=True). If given, the flags are taken from
+            this array instead of being read from the file, and
+            channels, start_time and end_time are ignored. A 1-D array
+            (e.g. the flags of one channel) is treated as one column \n
+        \n Returns a list with one array per channel (column of the
+        flags) holding the scan numbers, counted from the first scan
+        of the flags, at which the bit differs from the previous scan.
+        Multiply by 'getTimeBetweenSamples' and add start_time for the
+        time in seconds since start of data acquesition."""
+        import numpy as np
+        if bit not in (0, 1):
+            raise ValueError("bit must be 0 (D0) or 1 (D1)")
+        if adc_flags is None:
+            adc_flags = self.readFlags(channels, start_time, end_time)
+        adc_flags = np.asarray(adc_flags)
+        if adc_flags.ndim == 1:
+            # flags of a single channel, e.g. adc_flags[:, 0]
+            adc_flags = adc_flags[:, np.newaxis]
+        elif adc_flags.ndim != 2:
+            raise ValueError("adc_flags must be a 1-D or 2-D array")
+        states = (adc_flags >> bit) & 1
+        changed = states[1:] != states[:-1]
+        return [np.flatnonzero(changed[:, column]) + 1
+                for column in range(states.shape[1])]
+
+    # converts the channels argument of the read methods into a numpy
+    # array of channel numbers and checks that all of them were recorded
+    def _getChannels(self, channels):
+        """Returns 'channels' as numpy array of channel numbers"""
+        import numpy as np
         # converting channels argument into numpy array to loop over
-        if channels == None:
+        if channels is None:
             channels = np.arange(self.acq_channels)
         elif type(channels) == int:
             channels = np.array([channels])
         else:
             channels = np.array(channels)
-        # determining how many bits are used to store the data,
-        # which depends on whether the file is hiRes or not
-        if self.hiRes:
-            adc_bit_length = 16
-        else:
-            adc_bit_length = 14
-        # opening file
-        bin_data = open(self.location, "rb")
+        for channel in channels:
+            if channel >= self.acq_channels:
+                raise IndexError("One or more of the provided channel "
+                                 + "numbers "
+                                 + "are outside the range of channels "
+                                 + "with recorded data: \n"
+                                 + str(channel))
+        return channels
+
+    # determines the byte at which reading of the adc data starts and
+    # the number of scans (one data point of every acquired channel)
+    # that are read for the given start and end time
+    def _getScanRange(self, start_time=0, end_time=None):
+        """Returns the start byte and number of scans between
+        'start_time' and 'end_time'"""
         # determining start byte based on the start time given
         # self.header[12] stores time bewteen samples,
         # self.header[4] stores number of bytes in header
         # each channel takes up 2 bytes per datapoint in adc data
         start_byte = int((start_time / self.header[12]) * self.acq_channels * 2
                          + self.header[4])
-        bin_data.seek(start_byte, 0)
         # determining end byte relative to the start byte based on
         # end time given, if none is given all adc data from start
         # byte to the end of the adc data section is read
-        if end_time == None:
+        if end_time is None:
             end_byte = self.adc_data_bytes + self.header[4] - start_byte
         else:
             end_byte = int(((end_time - start_time) / self.header[12])
                            * self.acq_channels * 2)
+        return start_byte, int(end_byte / (2 * self.acq_channels))
 
-        # setting up adc data array based on whether save_memory is
-        # set to true or not
-        if save_memory:
-            self.adc_data = np.empty([int(end_byte / (2 * self.acq_channels)),
-                                      len(channels)], dtype=np.int16)
-        else:
-            self.adc_data = np.empty([int(end_byte / (2 * self.acq_channels)),
-                                      len(channels)])
-        # applying a 7 hour offset if az_time is True to account for
-        # the 7 hour difference between arizona time and UTC
-        if az_time:
-            offset = -3600 * 7
+    # decodes 'scans' scans of adc data starting at 'start_byte' for the
+    # given channels into the array 'out'.
+    # The data is read and translated in chunks of ADC_CHUNK_SCANS scans
+    # so only 'out' needs to hold the whole result.
+    # If 'flags_out' is given, the flag bits of the same data points are
+    # stored in it from the same read. 'out' can be None if only the
+    # flag bits are needed
+    def _decodeADC(self, start_byte, scans, channels, out, save_memory=True,
+                   flags_out=None):
+        """Decodes ADC data of 'channels' into the array 'out'"""
+        import numpy as np
+        scan_bytes = 2 * self.acq_channels
+        # reads starting at the beginning of a scan are put together
+        # from the cached blocks if there is a block cache.
+        # The cached blocks do not keep the flag bits
+        if (self.block_cache is not None and flags_out is None
+                and start_byte >= self.header[4]
+                and (start_byte - self.header[4]) % scan_bytes == 0):
+            self._decodeCachedADC((start_byte - self.header[4]) // scan_bytes,
+                                  scans, channels, out, save_memory)
+            return
+        for i in range(0, scans, ADC_CHUNK_SCANS):
+            chunk_scans = min(ADC_CHUNK_SCANS, scans - i)
+            bin_data = self._readBytes(start_byte + i * scan_bytes,
+                                       chunk_scans * scan_bytes)
+            if len(bin_data) < chunk_scans * scan_bytes:
+                raise ValueError("File may be truncated or corrupted: "
+                                 + "ADC data section ends before byte "
+                                 + str(start_byte + scans * scan_bytes)
+                                 + "\n")
+            if flags_out is not None:
+                flags_out[i:i + chunk_scans] = self._translateFlags(
+                    bin_data)[:, channels]
+            if out is None:
+                continue
+            adc_data = self._translateADC(bin_data)[:, channels]
+            # scaling factor is only applied if save_memory is set
+            # to false
+            if not save_memory:
+                adc_data = adc_data * np.array(
+                    [self.header[33 + channel][2] for channel in channels])
+            out[i:i + chunk_scans] = adc_data
+
+    # translates the bytes 'bin_data' of whole scans into an array with
+    # one row per scan and one column per acquired channel
+    def _translateADC(self, bin_data):
+        """Returns the ADC data stored in 'bin_data' as int16 array"""
+        import numpy as np
+        # each data point is stored as a little endian 16 bit two's
+        # complement number. In files that are not hiRes only the upper
+        # 14 bits store the data, which an arithmetic shift by 2 bits
+        # converts to the correct value
+        if self.hiRes:
+            shift = 0
         else:
-            offset = 0
-        # setting up arrays to store the time stamps and the scaling
-        # factor for each channel.
-        # these are stored separately to increase memory efficiency on
-        # the main data
-        self.adc_time_stamps = np.empty([int(end_byte / (2 * self.acq_channels)),
-                                         3], dtype="U20")
-        self.adc_scaling = np.empty(len(channels))
-        # creating the adc data from the main body of the binary file
-        for i in range(int(end_byte / (2 * self.acq_channels))):
-            # reading 2 bytes per data point per channel
-            # as unsigned short, then converting it into binary string
-            for k, channel in enumerate(channels):
-                if channel >= self.acq_channels:
-                    raise IndexError("One or more of the provided channel "
-                                     + "numbers "
-                                     + "are outside the range of channels "
-                                     + "with recorded data: \n"
-                                     + str(channel))
-                # finding byte in adc data section where the current
-                # channel's information for the current time is stored
-                bin_data.seek(start_byte + 2 * i * self.acq_channels + 2
-                              * channel, 0)
-                adc_data_bin = "{0:016b}".format(
-                    struct.unpack("<H", bin_data.read(2))[0])
-                # determining the sign of the binary number
-                # by looking for bit 0,
-                # then corectly converting the relevant bits back
-                # to decimal and adding them to item list
-                if int(adc_data_bin[0]) == 0:
-                    adc_data_bin = (int(adc_data_bin[1:adc_bit_length], 2))
-                else:
-                    # converting negative two's complement binary
-                    # to decimal
-                    adc_data_bin = ((int(adc_data_bin[1:adc_bit_length], 2)
-                                     - (1 << len(adc_data_bin[1:adc_bit_length]
-                                                 ))))
-                # scaling factor is only applied if save_memory is set
-                # to false
-                if not save_memory:
-                    adc_data_bin = adc_data_bin * self.header[33 + channel][2]
-                self.adc_data[i, k] = adc_data_bin
-            # appending date and time to the item list,
-            # self.header[13] stores time of start of measurement,
-            # self.header[12] stores time between measurements
-            self.adc_time_stamps[i, 0] = (time.strftime(
-                "%m-%d-%Y", time.gmtime(self.header[13] + start_time + i
-                                        * self.header[12] + offset)))
-            self.adc_time_stamps[i, 1] = (time.strftime(
-                "%H:%M:%S", time.gmtime(self.header[13] + start_time + i
-                                        * self.header[12] + offset)))
-            self.adc_time_stamps[i, 2] = "{:.4f}".format(i * self.header[12])
-        # if save_memory is set to true, scaling factors will be saved
-        # in a separate list
+            shift = 2
+        return np.frombuffer(bin_data, dtype="<i2").reshape(
+            -1, self.acq_channels) >> shift
+
+    # returns the flag bits D0 and D1 of the bytes 'bin_data' of whole
+    # scans with one row per scan and one column per acquired channel
+    def _translateFlags(self, bin_data):
+        """Returns the flag bits stored in 'bin_data' as uint8 array"""
+        import numpy as np
+        # in files that are not hiRes the lowest 2 bits of each data
+        # point are not part of the data value
+        return (np.frombuffer(bin_data, dtype="<u2").reshape(
+            -1, self.acq_channels) & 3).astype(np.uint8)
+
+    # raises an error if the data points of the file have no flag bits
+    def _checkFlags(self):
+        """Raises ValueError for hiRes files"""
+        if self.hiRes:
+            raise ValueError("Flag bits are not available in hiRes files, "
+                             + "where bits D0 and D1 are data bits")
+
+    # decodes 'scans' scans starting at scan number 'first_scan' into
+    # 'out' from the blocks in the block cache, decoding and adding the
+    # blocks that are not cached yet
+    def _decodeCachedADC(self, first_scan, scans, channels, out,
+                         save_memory=True):
+        """Decodes ADC data of 'channels' into 'out' through the block
+        cache"""
+        import numpy as np
+        block_scans = self.block_cache.block_scans
+        scan_bytes = 2 * self.acq_channels
+        scaling = np.array([self.header[33 + channel][2]
+                            for channel in channels])
+        done = 0
+        while done < scans:
+            scan = first_scan + done
+            block_number = scan // block_scans
+            key = (self._cache_key, block_number)
+            block = self.block_cache.get(key)
+            if block is None:
+                # blocks are decoded for all channels, so reads of
+                # different channels share them
+                block_start = block_number * block_scans
+                bin_data = self._readBytes(
+                    self.header[4] + block_start * scan_bytes,
+                    block_scans * scan_bytes)
+                bin_data = bin_data[:len(bin_data)
+                                    - len(bin_data) % scan_bytes]
+                block = self._translateADC(bin_data)
+                self.block_cache.put(key, block)
+            block_offset = scan - block_number * block_scans
+            block_part = block[block_offset:block_offset + scans - done]
+            if len(block_part) == 0:
+                raise ValueError("File may be truncated or corrupted: "
+                                 + "ADC data section ends before byte "
+                                 + str(self.header[4] + (first_scan + scans)
+                                       * scan_bytes)
+                                 + "\n")
+            adc_data = block_part[:, channels]
+            # scaling factor is only applied if save_memory is set
+            # to false
+            if not save_memory:
+                adc_data = adc_data * scaling
+            out[done:done + len(block_part)] = adc_data
+            done += len(block_part)
+
+    # sets the block cache used for reading ADC data, None switches
+    # caching off
+    def setBlockCache(self, block_cache):
+        """param block_cache : BlockCache or None \n
+        Sets the cache of decoded blocks used when reading ADC data.
+        The same cache can be shared by several readers."""
+        self.block_cache = block_cache
+
+    # returns the total number of scans in the adc data section
+    def _getScanCount(self):
+        """Returns the number of scans in the ADC data section"""
+        return int(self.adc_data_bytes / (2 * self.acq_channels))
+
+    # returns 'scans' scans starting at scan number 'first_scan' of the
+    # given channels (numpy array of channel numbers)
+    def _readScans(self, first_scan, scans, channels, save_memory=True):
+        """Returns the ADC data of the given scans and channels"""
+        import numpy as np
         if save_memory:
-            for i, channel in enumerate(channels):
-                self.adc_scaling[i] = (self.header[33 + channel][2])
-        # saving channels numbers
-        self.channels = channels
+            adc_data = np.empty([scans, len(channels)], dtype=np.int16)
+        else:
+            adc_data = np.empty([scans, len(channels)])
+        self._decodeADC(self.header[4] + first_scan * 2 * self.acq_channels,
+                        scans, channels, adc_data, save_memory)
+        return adc_data
 
-        bin_data.close()
+    # creates the date, time and running timer of 'scans' scans starting
+    # at scan 'first' relative to 'start_time'
+    def _getTimeStamps(self, start_time, first, scans, az_time=True):
+        """Returns an array of time stamps for the given scans"""
+        # self.header[13] stores time of start of measurement,
+        # self.header[12] stores time between measurements.
+        return createTimeStamps(self.header[13], start_time, first, scans,
+                                self.header[12], az_time)
 
     # reads trailer of the file
     # header must be read first
@@ -320,10 +1037,19 @@ class CODASReader:
         if len(self.header) == 0:
             raise RuntimeError("Header has not been read or is empty"
                                + "Use 'readHeader' to read header")
-        bin_data = open(self.location, "rb")
-        bin_data.seek(self.header[4] + self.adc_data_bytes, 0)
+        self.trailer = self._translateTrailer()
+
+    # reads and translates the trailer of the file without storing it,
+    # so it can also be used by methods that must not change the reader
+    def _translateTrailer(self):
+        """Returns the translated trailer of the file"""
+        # reading the whole trailer in one go and translating it
+        # from memory
+        trailer_start = self.header[4] + self.adc_data_bytes
+        bin_data = io.BytesIO(self._readBytes(
+            trailer_start, self.bytes_in_file - trailer_start))
         # translating the trailer of the file
-        self.trailer = []
+        trailer = []
         trailer_pointers = []
         trailer_item = []
         marker = True
@@ -340,7 +1066,7 @@ class CODASReader:
         for i in range(int(self.header[6] / 4)):
             if marker:
                 trailer_item = [struct.unpack("<l", bin_data.read(4))[0]]
-                trailer_item[-1] = (np.abs(trailer_item[-1]) * 2
+                trailer_item[-1] = (abs(trailer_item[-1]) * 2
                                     * channels_hiRes) + self.header[4]
                 trailer_item[-1] = (int((trailer_item[-1] - self.header[4])
                                         / (2 * self.acq_channels))
@@ -360,7 +1086,7 @@ class CODASReader:
                 trailer_long = struct.unpack("<l", bin_data.read(4))[0]
                 if trailer_long > -1 * self.header[5] / (2 * channels_hiRes):
                     trailer_pointers.append(trailer_item)
-                    trailer_long = (np.abs(trailer_long) * 2
+                    trailer_long = (abs(trailer_long) * 2
                                     * channels_hiRes) + self.header[4]
                     trailer_long = (int((trailer_long - self.header[4])
                                         / (2 * self.acq_channels))
@@ -379,7 +1105,7 @@ class CODASReader:
             trailer_pointers.append(trailer_item)
         elif trailer_pointers[-1] != trailer_item:
             trailer_pointers.append(trailer_item)
-        self.trailer.append(trailer_pointers)
+        trailer.append(trailer_pointers)
 
         # translating second part of trailer
         # containing user annotations,
@@ -395,7 +1121,7 @@ class CODASReader:
                 trailer_item = ""
             else:
                 trailer_item = trailer_item + chr(int(trailer_byte))
-        self.trailer.append(trailer_annotations)
+        trailer.append(trailer_annotations)
 
         # translating all remaining bytes as
         # event marker comment part of the trailer,
@@ -412,9 +1138,8 @@ class CODASReader:
                 trailer_item = ""
             else:
                 trailer_item = trailer_item + chr(int(trailer_byte))
-        self.trailer.append(trailer_comments_dict)
-
-        bin_data.close()
+        trailer.append(trailer_comments_dict)
+        return trailer
 
     # printing list with header values
     def printHeader(self):
@@ -458,45 +1183,162 @@ class CODASReader:
         the channel that recorded the data in the column below. \n
         The third line will be the scaling factor for each channel
         in the column of the respective channel data."""
-        # np.savetxt(name, self.adc_data, delimiter = delim, fmt=fmt)
-        # writing the adc data to a csv file item by item to save
+        # writing the adc data to a csv file in chunks to save
         # memory
         with open(name, "w", newline="\n") as file:
-            # writing header at the top of the file if a header is given
-            file.write("#")
-            for item in header:
-                file.write(str(item))
-                file.write(delim)
-            file.write("\n")
-            # writing channel number for each column at the top of each
-            # column
-            file.write("#")
-            file.write(delim)
-            for item in self.channels:
-                file.write(str(item))
-                file.write(delim)
-            file.write("\n")
-            # writing the scaling factors at the top of the file
-            # scaling information for each channel will be the second
-            # item in the column corresponding to that channel after
-            # the channel number
-            file.write("#")
-            file.write(delim)
-            for item in self.adc_scaling:
-                file.write(str(item))
-                file.write(delim)
-            file.write("\n")
+            writeCSVHeader(file, delim, header, self.channels,
+                           self.adc_scaling)
             # writing adc data and time stamps
-            for i, item in enumerate(self.adc_data):
-                file.write(str(self.adc_time_stamps[i][-1]))
-                file.write(delim)
-                for seg in item:
-                    file.write(str(seg))
-                    file.write(delim)
-                file.write(str(self.adc_time_stamps[i][0]))
-                file.write(delim)
-                file.write(str(self.adc_time_stamps[i][1]))
-                file.write("\n")
+            for i in range(0, len(self.adc_data), ADC_CHUNK_SCANS):
+                writeCSVRows(file, delim,
+                             self.adc_data[i:i + ADC_CHUNK_SCANS],
+                             self.adc_time_stamps[i:i + ADC_CHUNK_SCANS])
+
+    # converts the adc data of the file to a CSV file without reading all
+    # of it into memory first.
+    # The conversion can be resumed if it is interrupted
+    def convertADCsToCSV(self, name, channels=None, start_time=0,
+                         end_time=None, delim=",", header=[], az_time=True,
+                         resume=True, chunk_size=ADC_CHUNK_SCANS,
+                         max_memory=None):
+        """param name : str \n
+            Name of the CSV file the output will be saved to \n
+        param channels, start_time, end_time, az_time : optional \n
+            See 'readADC' \n
+        param delim, header : optional \n
+            See 'saveADCsToCSV' \n
+        param resume : bool, optional \n
+            Decides whether an interrupted conversion to the same file
+            with the same arguments is continued. Default is True \n
+        param chunk_size : int, optional \n
+            Number of scans converted at once \n
+        param max_memory : int, optional \n
+            Maximum number of bytes used for converting a chunk,
+            'chunk_size' is reduced to fit if necessary \n
+        Reads the ADC data chunk by chunk and saves it to a CSV file
+        in the same format as 'saveADCsToCSV' (with save_memory = True).
+        The ADC data is not stored in this object. \n
+        The output is written to 'name'.partial with a checkpoint in
+        'name'.checkpoint after every chunk. If the conversion is
+        interrupted, running it again continues from the last
+        checkpoint. The finished output is renamed to 'name'."""
+        from .Export import convertADC
+        convertADC(self, name, "csv", channels, start_time, end_time,
+                   delim=delim, header=header, az_time=az_time,
+                   resume=resume, chunk_size=chunk_size,
+                   max_memory=max_memory)
+
+    # converts the adc data of the file to a binary file without reading
+    # all of it into memory first.
+    # The conversion can be resumed if it is interrupted
+    def convertADCsToBinary(self, name, channels=None, start_time=0,
+                            end_time=None, dtype="int16", resume=True,
+                            chunk_size=ADC_CHUNK_SCANS, max_memory=None):
+        """param name : str \n
+            Name of the binary file the output will be saved to \n
+        param channels, start_time, end_time : optional \n
+            See 'readADC' \n
+        param dtype : str, optional \n
+            'int16' for the data as stored in the file (scaling factor
+            not applied) or 'float32' for the data with the scaling
+            factor applied. Default is 'int16' \n
+        param resume, chunk_size, max_memory : optional \n
+            See 'convertADCsToCSV' \n
+        Saves the ADC data as little endian values without any header,
+        one value per channel for each scan, in the order of
+        'channels'. Like 'convertADCsToCSV' the conversion can be
+        resumed if it is interrupted."""
+        from .Export import convertADC
+        convertADC(self, name, "binary", channels, start_time, end_time,
+                   dtype=dtype, resume=resume, chunk_size=chunk_size,
+                   max_memory=max_memory)
+
+    # writes the adc data of the file chunk by chunk to an open binary
+    # file object such as sys.stdout.buffer, e.g. for use in pipelines
+    def streamADC(self, file, output_format="csv", channels=None,
+                  start_time=0, end_time=None, delim=",", header=[],
+                  az_time=True, dtype="int16", chunk_size=ADC_CHUNK_SCANS,
+                  max_memory=None):
+        """param file : binary file object \n
+            Output the data is written to, it is flushed but not
+            closed \n
+        param output_format : str, optional \n
+            'csv' for the format of 'saveADCsToCSV' or 'binary' for
+            the format of 'convertADCsToBinary'. Default is 'csv' \n
+        param channels, start_time, end_time, az_time : optional \n
+            See 'readADC' \n
+        param delim, header : optional \n
+            See 'saveADCsToCSV' \n
+        param dtype : str, optional \n
+            See 'convertADCsToBinary' \n
+        param chunk_size, max_memory : optional \n
+            See 'convertADCsToCSV' \n
+        Decodes the ADC data chunk by chunk and writes every chunk to
+        'file' at once, so only one chunk is held in memory. Unlike
+        'convertADCsToCSV' the output cannot be resumed."""
+        from .Export import streamADC
+        streamADC(self, file, output_format, channels, start_time,
+                  end_time, delim=delim, header=header, az_time=az_time,
+                  dtype=dtype, chunk_size=chunk_size, max_memory=max_memory)
+
+    # returns the adc data as pandas DataFrame with the time of each scan
+    # as index. The time is calculated from the header instead of
+    # parsing time stamp strings
+    def toDataFrame(self, channels=None, start_time=0, end_time=None,
+                    az_time=True, scaled=False):
+        """param channels, start_time, end_time, az_time : optional \n
+            See 'readADC' \n
+        param scaled : bool, optional \n
+            Decides whether the scaling factor is applied to the data.
+            Default is False \n
+        Returns the ADC data as pandas DataFrame with one column per
+        channel and a DatetimeIndex in UTC or Arizona time. \n
+        The columns are named after the user annotations of the
+        channels in the trailer (the trailer is read if necessary),
+        channels without annotation are named 'channel n'. \n
+        Unless 'scaled' is True, the DataFrame holds the int16 data as
+        stored in the file without copying it, the scaling factor of
+        each column is stored in DataFrame.attrs['scaling'] and can be
+        applied when needed:
+        data_frame * pandas.Series(data_frame.attrs['scaling']). \n
+        Requires pandas. The data is not stored in this object."""
+        from .Frames import toDataFrame
+        return toDataFrame(self, channels, start_time, end_time, az_time,
+                           scaled)
+
+    # reads the adc data chunk by chunk as pandas DataFrames, so files
+    # of any length can be processed with pandas
+    def iterDataFrames(self, channels=None, start_time=0, end_time=None,
+                       az_time=True, scaled=False,
+                       chunk_size=ADC_CHUNK_SCANS):
+        """param channels, start_time, end_time, az_time, scaled :
+            optional \n
+            See 'toDataFrame' \n
+        param chunk_size : int, optional \n
+            Number of scans per DataFrame \n
+        Yields the ADC data as DataFrames like 'toDataFrame' of up to
+        'chunk_size' scans each, so only one chunk is held in memory
+        unless the DataFrames are kept."""
+        from .Frames import iterDataFrames
+        return iterDataFrames(self, channels, start_time, end_time,
+                              az_time, scaled, chunk_size)
+
+    # returns the adc data as xarray DataArray labelled with the time of
+    # each scan and the channel numbers and names
+    def toXArray(self, channels=None, start_time=0, end_time=None,
+                 az_time=True, scaled=False):
+        """param channels, start_time, end_time, az_time, scaled :
+            optional \n
+            See 'toDataFrame' \n
+        Returns the ADC data as xarray DataArray with the dimensions
+        'time' and 'channel'. The channel dimension carries the
+        coordinates 'name' (see 'toDataFrame') and 'scaling', so the
+        scaling factor can be applied when needed with
+        data_array * data_array.scaling. \n
+        Requires xarray. The data is not stored in this object."""
+        from .Frames import toXArray
+        return toXArray(self, channels, start_time, end_time, az_time,
+                        scaled)
 
     # printing the trailer element of the file
     def printTrailer(self):
@@ -665,6 +1507,32 @@ class CODASReader:
         """Returns total sample rate (samples / s)"""
         return 1 / self.header[12] * self.acq_channels
 
+    # return a dictionary with the most important information from the
+    # file header. Only the header is needed for this, so it is a fast
+    # way of inquiring information from large numbers of files
+    def getMetadata(self, az_time=True):
+        """Returns a dictionary with information from the file header
+        including start and finish time, duration, sample rate and
+        number of acquired channels. \n
+        param az_time: bool, optional \n
+            Switches between Arizona time and UTC (default: Arizona time)"""
+        return {
+            "file": str(self.location),
+            "bytes_in_file": self.bytes_in_file,
+            "header_length": self.getHeaderLength(),
+            "adc_data_length": self.adc_data_bytes,
+            "acq_channels": self.acq_channels,
+            "packed": self.packed,
+            "hiRes": self.hiRes,
+            "time_between_samples": self.getTimeBetweenSamples(),
+            "sample_rate": self.getSampleRate(),
+            "acq_time": self.getAcqTime(az_time),
+            "finish_time": self.getFinishTime(az_time),
+            "acq_timestamp": self.header[13],
+            "finish_timestamp": self.header[14],
+            "duration": self.getMeasurementTimeFrame(),
+        }
+
 
 # only runs if program is run directly from file
 if __name__ == "__main__":
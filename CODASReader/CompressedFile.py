@@ -0,0 +1,371 @@
+import bisect
+import os
+import threading
+import zlib
+
+# magic bytes at the start of gzip members and zstd frames
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# number of compressed bytes passed to the decompressor at once
+COMPRESSED_READ_SIZE = 65536
+# number of uncompressed bytes per gzip member / zstd frame written by
+# compressFile
+COMPRESSED_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+# returns the compression format of data starting with 'first_bytes'
+# or None if it is not compressed
+def getCompression(first_bytes):
+    """Returns 'gzip', 'zstd' or None depending on the magic bytes
+    at the start of 'first_bytes'"""
+    if first_bytes[:2] == GZIP_MAGIC:
+        return "gzip"
+    if first_bytes[:4] == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+# returns a decompressor for a single gzip member or zstd frame.
+# Both types of decompressor stop at the end of the member / frame and
+# provide the remaining input in 'unused_data'.
+# zstd is supported through the compression.zstd module of the standard
+# library (Python 3.14) or the zstandard package
+def _newDecompressor(compression):
+    """Returns a new decompressor for one gzip member or zstd frame"""
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=31)
+    try:
+        from compression import zstd
+        return zstd.ZstdDecompressor()
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading zstd compressed files requires "
+                          + "Python 3.14 or the 'zstandard' package")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+# returns a compressor writing a single gzip member or zstd frame
+def _newCompressor(compression, level):
+    """Returns a function compressing bytes into one gzip member or
+    zstd frame"""
+    if compression == "gzip":
+        return lambda data: zlib.compress(data, level, wbits=31)
+    try:
+        from compression import zstd
+        return lambda data: zstd.compress(data, level)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Writing zstd compressed files requires "
+                          + "Python 3.14 or the 'zstandard' package")
+    compressor = zstandard.ZstdCompressor(level=level)
+    return compressor.compress
+
+
+class CompressedFile:
+    """Read only, seekable file object for gzip or zstd compressed
+    files. \n
+    Random access is provided through an index of seek points, which
+    are the starts of the gzip members or zstd frames in the file.
+    Reading from any position only decompresses the data from the
+    closest seek point before it. The index is built by decompressing
+    the file once. If the file has more than one seek point, the index
+    is stored next to the file ('name of file'.idx) to be reused. \n
+    Files compressed by standard tools usually consist of a single
+    member / frame, in which case data before the requested position
+    is decompressed (without storing it). Use 'compressFile' to write
+    files with a seek point every few MB. \n
+    Sequential reads continue decompressing where the last read
+    stopped. \n
+    param source : str or file-like object \n
+        Location of the compressed file or a binary file object
+        opened for reading \n
+    param index_location : str, optional \n
+        Location of the index file (default: 'name of file'.idx,
+        no index file is stored for file objects) \n
+    param save_index : bool, optional \n
+        Decides whether a newly built index is stored (default: True) \n
+    param index : dict, optional \n
+        Index returned by 'getIndex' of an earlier CompressedFile of
+        the same file, used instead of building or loading the index"""
+
+    def __init__(self, source, index_location=None, save_index=True,
+                 index=None):
+        if hasattr(source, "read"):
+            self._raw = source
+            self._close_raw = False
+        else:
+            self._raw = open(source, "rb")
+            self._close_raw = True
+            if index_location is None:
+                index_location = os.fspath(source) + ".idx"
+        self.index_location = index_location
+        self._raw.seek(0, 2)
+        self.compressed_size = self._raw.tell()
+        self._raw.seek(0, 0)
+        self.compression = getCompression(self._raw.read(4))
+        if self.compression is None:
+            raise ValueError("File is neither gzip nor zstd compressed")
+        self._lock = threading.RLock()
+        self._position = 0
+        # state of the last decompression, used to continue sequential
+        # reads without starting again from the last seek point
+        self._stream = None
+        if not (self._useIndex(index) or self._loadIndex()):
+            self._buildIndex()
+            # an index with a single seek point does not speed up reads,
+            # so files compressed by the standard tools get no index file
+            if (save_index and self.index_location is not None
+                    and len(self._points) > 1):
+                self._saveIndex()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # returns the modification time of the compressed file,
+    # used to check that a stored index belongs to the file
+    def _getModificationTime(self):
+        """Returns modification time of the compressed file or None"""
+        try:
+            return os.fstat(self._raw.fileno()).st_mtime
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    # returns the index of seek points in the format of the index file
+    def getIndex(self):
+        """Returns the index of seek points as dictionary, which can be
+        passed as 'index' when the file is opened again"""
+        return {"compression": self.compression,
+                "compressed_size": self.compressed_size,
+                "mtime": self._getModificationTime(),
+                "size": self.size,
+                "points": [list(point) for point in
+                           zip(self._compressed_points, self._points)]}
+
+    # uses 'index' (see getIndex) if it matches the compressed file
+    def _useIndex(self, index):
+        """Uses 'index', returns False if it is None or does not match"""
+        if index is None:
+            return False
+        if (index.get("compression") != self.compression
+                or index.get("compressed_size") != self.compressed_size
+                or index.get("mtime") != self._getModificationTime()):
+            return False
+        self.size = index["size"]
+        self._compressed_points = [point[0] for point in index["points"]]
+        self._points = [point[1] for point in index["points"]]
+        return True
+
+    # reads the index from the index file if it exists and matches
+    # the compressed file
+    def _loadIndex(self):
+        """Loads the index file, returns False if there is no valid one"""
+        # json is only needed for compressed files, so it is not imported
+        # with the package
+        import json
+        if self.index_location is None:
+            return False
+        try:
+            with open(self.index_location, "r") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return False
+        return self._useIndex(index)
+
+    # stores the index in the index file.
+    # The index is written to a temporary file first so an interrupted
+    # write never leaves a broken index
+    def _saveIndex(self):
+        """Writes the index to the index file, if possible"""
+        import json
+        index = self.getIndex()
+        temporary_location = self.index_location + ".tmp"
+        try:
+            with open(temporary_location, "w") as index_file:
+                json.dump(index, index_file)
+            os.replace(temporary_location, self.index_location)
+        except OSError:
+            # the index is only a cache, read only archives simply
+            # build it again the next time
+            pass
+
+    # decompresses the whole file once to find the start of every
+    # gzip member / zstd frame and the total uncompressed size
+    def _buildIndex(self):
+        """Builds the index of seek points"""
+        self._compressed_points = []
+        self._points = []
+        self.size = 0
+        for compressed_offset, data in self._decompress(0):
+            if compressed_offset is not None:
+                self._compressed_points.append(compressed_offset)
+                self._points.append(self.size)
+            self.size += len(data)
+
+    # generator decompressing the file from the compressed offset 'start'
+    # onwards, which must be the start of a member / frame.
+    # yields the compressed offset of every new member / frame
+    # (None otherwise) together with the decompressed data
+    def _decompress(self, start):
+        """Yields (compressed offset of new member or None, data)"""
+        position = start
+        data = b""
+        decompressor = None
+        while True:
+            if not data:
+                with self._lock:
+                    self._raw.seek(position, 0)
+                    data = self._raw.read(COMPRESSED_READ_SIZE)
+                if not data:
+                    return
+            new_member = None
+            if decompressor is None:
+                # anything after the last member that is not another
+                # member (e.g. padding) is ignored
+                if getCompression(data.ljust(4, b"\0")) != self.compression:
+                    return
+                decompressor = _newDecompressor(self.compression)
+                new_member = position
+            output = decompressor.decompress(data)
+            if decompressor.eof:
+                unused_data = decompressor.unused_data
+                position += len(data) - len(unused_data)
+                data = unused_data
+                decompressor = None
+            else:
+                position += len(data)
+                data = b""
+            yield new_member, output
+
+    # returns 'length' bytes starting at the uncompressed 'offset'.
+    # continues the last decompression if it stopped before 'offset',
+    # otherwise starts at the closest seek point before 'offset'
+    def readAt(self, offset, length):
+        """Returns 'length' bytes of uncompressed data starting at
+        'offset'. Less bytes are returned at the end of the file."""
+        length = max(0, min(length, self.size - offset))
+        if length == 0:
+            return b""
+        with self._lock:
+            # the last decompression is only continued if there is no
+            # seek point between where it stopped and offset
+            point = bisect.bisect_right(self._points, offset) - 1
+            if (self._stream is not None
+                    and self._points[point] <= self._stream[1] <= offset):
+                stream, stream_offset, buffered = self._stream
+            else:
+                stream = self._decompress(self._compressed_points[point])
+                stream_offset = self._points[point]
+                buffered = b""
+            self._stream = None
+            # skipping data before offset, then collecting the data
+            result = []
+            collected = 0
+            while True:
+                if not buffered:
+                    try:
+                        buffered = next(stream)[1]
+                    except StopIteration:
+                        break
+                    continue
+                if stream_offset + len(buffered) <= offset:
+                    stream_offset += len(buffered)
+                    buffered = b""
+                    continue
+                start = max(0, offset - stream_offset)
+                part = buffered[start:start + length - collected]
+                result.append(part)
+                collected += len(part)
+                if collected == length:
+                    # keeping the rest of the decompressed data for the
+                    # next sequential read
+                    used = start + len(part)
+                    self._stream = (stream, stream_offset + used,
+                                    buffered[used:])
+                    break
+                stream_offset += len(buffered)
+                buffered = b""
+            return b"".join(result)
+
+    # file object interface
+    def read(self, size=-1):
+        """Reads up to 'size' bytes from the current position"""
+        with self._lock:
+            if size is None or size < 0:
+                size = self.size - self._position
+            data = self.readAt(self._position, size)
+            self._position += len(data)
+            return data
+
+    def seek(self, offset, whence=0):
+        """Moves the current position like io.IOBase.seek"""
+        with self._lock:
+            if whence == 1:
+                offset += self._position
+            elif whence == 2:
+                offset += self.size
+            if offset < 0:
+                raise ValueError("negative seek position " + str(offset))
+            self._position = offset
+            return self._position
+
+    def tell(self):
+        """Returns the current position"""
+        return self._position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        """Closes the compressed file"""
+        self._stream = None
+        if self._close_raw:
+            self._raw.close()
+
+
+# compresses the file 'location' into independent gzip members or zstd
+# frames of COMPRESSED_BLOCK_SIZE uncompressed bytes each, so that it can
+# later be read with random access.
+# The result can be decompressed by the standard gzip / zstd tools
+def compressFile(location, destination=None, compression="gzip",
+                 block_size=COMPRESSED_BLOCK_SIZE, level=6):
+    """param location : str \n
+        File that should be compressed \n
+    param destination : str, optional \n
+        Location of the compressed file
+        (default: 'location'.gz or 'location'.zst) \n
+    param compression : str, optional \n
+        'gzip' (default) or 'zstd' \n
+    param block_size : int, optional \n
+        Number of uncompressed bytes between two seek points \n
+    param level : int, optional \n
+        Compression level \n
+    Compresses a file so it can be read with random access by
+    CODASReader and writes its index. Returns the destination."""
+    if compression not in ("gzip", "zstd"):
+        raise ValueError("Unknown compression: " + str(compression)
+                         + " (expected 'gzip' or 'zstd')")
+    if destination is None:
+        destination = os.fspath(location) + (
+            ".gz" if compression == "gzip" else ".zst")
+    compress = _newCompressor(compression, level)
+    with open(location, "rb") as source, open(destination, "wb") as output:
+        while True:
+            block = source.read(block_size)
+            if not block:
+                break
+            output.write(compress(block))
+    # building and storing the index right away
+    CompressedFile(destination).close()
+    return destination
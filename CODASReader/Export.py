@@ -0,0 +1,261 @@
+import io
+import json
+import os
+import zlib
+import numpy as np
+from .CODASReader import (ADC_CHUNK_SCANS, createTimeStamps, getChunkScans,
+                          writeCSVHeader, writeCSVRows)
+
+# number of bytes read at once when checking the checksum of a partially
+# written output
+CHECKSUM_READ_SIZE = 1024 * 1024
+
+
+class CheckpointedFile:
+    """Output file that is written in chunks and can be resumed after
+    the writing process was interrupted. \n
+    The data is written to 'name'.partial. After every checkpoint, the
+    number of finished scans, the number of bytes written and a CRC32
+    checksum of these bytes are stored in 'name'.checkpoint, which is
+    replaced atomically. When the output is opened again with the same
+    parameters, the partial output is checked against the checkpoint,
+    cut back to the checkpoint and continued from there. \n
+    Once all data is written, 'commit' renames the partial output to
+    'name', so a file of that name is always complete. \n
+    param name : str \n
+        Name of the finished output file \n
+    param parameters : dict \n
+        Everything that determines the content of the output.
+        A checkpoint is only used if its parameters are the same \n
+    param resume : bool, optional \n
+        Decides whether an existing checkpoint is used (default: True)"""
+
+    def __init__(self, name, parameters, resume=True):
+        self.name = name
+        self.partial_name = name + ".partial"
+        self.checkpoint_name = name + ".checkpoint"
+        self.parameters = json.loads(json.dumps(parameters))
+        # number of finished scans, bytes written and their checksum
+        self.scans = 0
+        self.position = 0
+        self.checksum = 0
+        self._file = None
+        if resume:
+            self._resume()
+        if self._file is None:
+            self._file = open(self.partial_name, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        # an unfinished output is kept with its checkpoint to be resumed
+        self.close()
+
+    # opens the partial output at the last checkpoint if there is a
+    # valid one
+    def _resume(self):
+        """Continues the partial output from its checkpoint if valid"""
+        try:
+            with open(self.checkpoint_name, "r") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            partial = open(self.partial_name, "r+b")
+        except (OSError, ValueError):
+            return
+        if (checkpoint.get("parameters") != self.parameters
+                or os.fstat(partial.fileno()).st_size
+                < checkpoint["position"]):
+            partial.close()
+            return
+        # checking that the data written before the checkpoint is intact
+        checksum = 0
+        remaining = checkpoint["position"]
+        while remaining > 0:
+            data = partial.read(min(CHECKSUM_READ_SIZE, remaining))
+            if not data:
+                break
+            checksum = zlib.crc32(data, checksum)
+            remaining -= len(data)
+        if remaining > 0 or checksum != checkpoint["checksum"]:
+            partial.close()
+            return
+        # removing anything written after the checkpoint
+        partial.truncate(checkpoint["position"])
+        partial.seek(checkpoint["position"], 0)
+        self._file = partial
+        self.scans = checkpoint["scans"]
+        self.position = checkpoint["position"]
+        self.checksum = checkpoint["checksum"]
+
+    # writes 'data' (bytes) to the output
+    def write(self, data):
+        """Writes the bytes 'data' to the partial output"""
+        self._file.write(data)
+        self.position += len(data)
+        self.checksum = zlib.crc32(data, self.checksum)
+
+    # makes sure everything written so far is on disk and records
+    # that 'scans' scans are finished
+    def checkpoint(self, scans):
+        """Stores a checkpoint after 'scans' finished scans"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.scans = scans
+        checkpoint = {"parameters": self.parameters, "scans": scans,
+                      "position": self.position, "checksum": self.checksum}
+        temporary_name = self.checkpoint_name + ".tmp"
+        with open(temporary_name, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_name, self.checkpoint_name)
+
+    # renames the finished output to its final name and removes the
+    # checkpoint
+    def commit(self):
+        """Finishes the output and gives it its final name"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.partial_name, self.name)
+        try:
+            os.remove(self.checkpoint_name)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Closes the partial output without finishing it"""
+        if not self._file.closed:
+            self._file.close()
+
+
+# returns the bytes of the binary output format for 'adc_data' (int16
+# data without scaling factor applied)
+def _toBinary(adc_data, adc_scaling, dtype):
+    """Returns adc_data as interleaved little endian binary data"""
+    if dtype == "int16":
+        return adc_data.astype("<i2").tobytes()
+    return (adc_data * adc_scaling).astype("<f4").tobytes()
+
+
+# checks the arguments of an export and returns the channels, the first
+# byte, the number of scans, the number of scans per chunk and the
+# scaling factors of the exported data
+def _prepareExport(reader, output_format, dtype, channels, start_time,
+                   end_time, chunk_size, max_memory):
+    """Returns (channels, start_byte, scans, chunk_size, adc_scaling)"""
+    if output_format not in ("csv", "binary"):
+        raise ValueError("Unknown output format: " + str(output_format)
+                         + " (expected 'csv' or 'binary')")
+    if dtype not in ("int16", "float32"):
+        raise ValueError("Unknown binary data type: " + str(dtype)
+                         + " (expected 'int16' or 'float32')")
+    # raise error if header list is empty
+    if len(reader.header) == 0:
+        raise RuntimeError("Header has not been read or is empty"
+                           + "Use 'readHeader' to read header")
+    channels = reader._getChannels(channels)
+    start_byte, scans = reader._getScanRange(start_time, end_time)
+    # smaller chunks are converted if they would not fit into max_memory
+    if max_memory is not None:
+        chunk_size = min(chunk_size, getChunkScans(
+            max_memory, len(channels), reader.acq_channels, output_format,
+            dtype))
+    adc_scaling = np.array([reader.header[33 + channel][2]
+                            for channel in channels])
+    return channels, start_byte, scans, chunk_size, adc_scaling
+
+
+# returns the bytes of the three CSV header lines
+def _csvHeader(delim, header, channels, adc_scaling):
+    """Returns the CSV header lines as bytes"""
+    text = io.StringIO()
+    writeCSVHeader(text, delim, header, channels, adc_scaling)
+    return text.getvalue().encode()
+
+
+# generator decoding the ADC data chunk by chunk from scan 'first' on
+# and yielding the number of finished scans and the bytes of the output
+# for each chunk. Only one chunk is held in memory at a time
+def _iterChunks(reader, output_format, channels, start_byte, scans, first,
+                chunk_size, adc_scaling, start_time=0, delim=",",
+                az_time=True, dtype="int16"):
+    """Yields (finished scans, bytes) for every chunk of the output"""
+    adc_data = np.empty([max(0, min(chunk_size, scans - first)),
+                         len(channels)], dtype=np.int16)
+    for first in range(first, scans, chunk_size):
+        chunk_scans = min(chunk_size, scans - first)
+        reader._decodeADC(
+            start_byte + first * 2 * reader.acq_channels, chunk_scans,
+            channels, adc_data[:chunk_scans])
+        if output_format == "csv":
+            text = io.StringIO()
+            writeCSVRows(text, delim, adc_data[:chunk_scans],
+                         createTimeStamps(reader.header[13], start_time,
+                                          first, chunk_scans,
+                                          reader.header[12], az_time))
+            yield first + chunk_scans, text.getvalue().encode()
+        else:
+            yield first + chunk_scans, _toBinary(adc_data[:chunk_scans],
+                                                 adc_scaling, dtype)
+
+
+# converts the ADC data of 'reader' chunk by chunk into a CSV or binary
+# output, taking a checkpoint after every chunk
+def convertADC(reader, name, output_format="csv", channels=None,
+               start_time=0, end_time=None, delim=",", header=[],
+               az_time=True, dtype="int16", resume=True,
+               chunk_size=ADC_CHUNK_SCANS, max_memory=None):
+    """Converts ADC data to a file of 'output_format' ('csv' or
+    'binary'), see CODASReader.convertADCsToCSV and
+    CODASReader.convertADCsToBinary"""
+    channels, start_byte, scans, chunk_size, adc_scaling = _prepareExport(
+        reader, output_format, dtype, channels, start_time, end_time,
+        chunk_size, max_memory)
+    # the input is identified by its absolute path, size and
+    # modification time, so a checkpoint is not used for a file that was
+    # rewritten or for another file of the same relative name.
+    # File objects get a new identity for every reader and start again
+    parameters = {"file": list(reader._cache_key),
+                  "bytes_in_file": reader.bytes_in_file,
+                  "format": output_format, "channels": channels.tolist(),
+                  "start_byte": start_byte, "scans": scans}
+    if output_format == "csv":
+        parameters.update({"delim": delim,
+                           "header": [str(item) for item in header],
+                           "az_time": az_time})
+    else:
+        parameters["dtype"] = dtype
+
+    with CheckpointedFile(name, parameters, resume) as output:
+        if output.position == 0 and output_format == "csv":
+            output.write(_csvHeader(delim, header, channels, adc_scaling))
+            output.checkpoint(0)
+        for finished, data in _iterChunks(
+                reader, output_format, channels, start_byte, scans,
+                output.scans, chunk_size, adc_scaling, start_time, delim,
+                az_time, dtype):
+            output.write(data)
+            output.checkpoint(finished)
+        output.commit()
+
+
+# writes the ADC data of 'reader' chunk by chunk to the binary file
+# object 'file' (e.g. sys.stdout.buffer), so memory use does not depend
+# on the amount of data written
+def streamADC(reader, file, output_format="csv", channels=None,
+              start_time=0, end_time=None, delim=",", header=[],
+              az_time=True, dtype="int16", chunk_size=ADC_CHUNK_SCANS,
+              max_memory=None):
+    """Writes ADC data in 'output_format' ('csv' or 'binary') to 'file',
+    see CODASReader.streamADC"""
+    channels, start_byte, scans, chunk_size, adc_scaling = _prepareExport(
+        reader, output_format, dtype, channels, start_time, end_time,
+        chunk_size, max_memory)
+    if output_format == "csv":
+        file.write(_csvHeader(delim, header, channels, adc_scaling))
+    for finished, data in _iterChunks(
+            reader, output_format, channels, start_byte, scans, 0,
+            chunk_size, adc_scaling, start_time, delim, az_time, dtype):
+        file.write(data)
+    file.flush()
@@ -0,0 +1,156 @@
+import datetime
+import numpy as np
+from .CODASReader import ADC_CHUNK_SCANS
+
+# time zone of the time index when az_time is True, Arizona local time
+# is 7 hours behind UTC all year
+ARIZONA_TIME = datetime.timezone(datetime.timedelta(hours=-7), "MST")
+
+
+# pandas and xarray are optional, they are only imported once an
+# adapter is used
+def _importPandas():
+    """Returns the pandas module"""
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("Converting ADC data to a DataFrame requires "
+                          + "the 'pandas' package")
+    return pandas
+
+
+def _importXArray():
+    """Returns the xarray module"""
+    try:
+        import xarray
+    except ImportError:
+        raise ImportError("Converting ADC data to a DataArray requires "
+                          + "the 'xarray' package")
+    return xarray
+
+
+# returns the times of 'scans' scans starting at scan 'first' of data
+# that starts 'start_time' seconds after the start of data acquesition.
+# The times are calculated in integer nanoseconds from the header, so
+# no time stamp strings have to be created or parsed
+def getTimeIndex(reader, start_time=0, first=0, scans=None, az_time=True):
+    """Returns a pandas DatetimeIndex of the given scans in UTC or
+    Arizona time"""
+    pandas = _importPandas()
+    if scans is None:
+        scans = reader._getScanCount() - first
+    # self.header[13] stores the time of start of measurement in seconds
+    # since epoch and self.header[12] the time between samples
+    start = int(round((reader.header[13] + start_time) * 1e9))
+    times = start + np.rint(np.arange(first, first + scans)
+                            * (reader.header[12] * 1e9)).astype(np.int64)
+    index = pandas.DatetimeIndex(times.view("datetime64[ns]"), tz="UTC",
+                                 name="time")
+    if az_time:
+        index = index.tz_convert(ARIZONA_TIME)
+    return index
+
+
+# returns a label for each channel, which is the user annotation of the
+# channel in the trailer if there is one and 'channel n' otherwise.
+# If the trailer has not been read yet, it is translated without storing
+# it in the reader, so readers shared by several threads are not changed
+def getChannelNames(reader, channels=None):
+    """Returns a list with the name of each channel"""
+    channels = reader._getChannels(channels)
+    trailer = reader.trailer
+    if len(trailer) == 0:
+        trailer = reader._translateTrailer()
+    # trailer[1] stores the user annotation of each channel
+    annotations = trailer[1]
+    names = []
+    for channel in channels:
+        name = ""
+        if channel < len(annotations):
+            name = annotations[channel].strip()
+        if not name or name in names:
+            name = "channel " + str(channel)
+        names.append(name)
+    return names
+
+
+# wraps the int16 ADC data of one window in a DataFrame without copying
+# it. The scaling factors are stored in the attrs of the DataFrame and
+# only applied if 'scaled' is True
+def _createDataFrame(reader, adc_data, channels, names, adc_scaling,
+                     start_time, first, az_time, scaled):
+    """Returns the ADC data as pandas DataFrame"""
+    pandas = _importPandas()
+    if scaled:
+        adc_data = adc_data * adc_scaling
+    data_frame = pandas.DataFrame(
+        adc_data, columns=pandas.Index(names, name="channel"),
+        index=getTimeIndex(reader, start_time, first, len(adc_data),
+                           az_time),
+        copy=False)
+    data_frame.attrs["channels"] = channels.tolist()
+    if scaled:
+        data_frame.attrs["scaling"] = dict.fromkeys(names, 1.0)
+    else:
+        data_frame.attrs["scaling"] = dict(zip(names,
+                                               adc_scaling.tolist()))
+    return data_frame
+
+
+# reads ADC data into a DataFrame indexed by the time of each scan
+def toDataFrame(reader, channels=None, start_time=0, end_time=None,
+                az_time=True, scaled=False):
+    """Returns ADC data as pandas DataFrame,
+    see CODASReader.toDataFrame"""
+    adc_window = reader.getADC(channels, start_time, end_time)
+    return _createDataFrame(
+        reader, adc_window.adc_data, adc_window.channels,
+        getChannelNames(reader, adc_window.channels),
+        adc_window.adc_scaling, start_time, 0, az_time, scaled)
+
+
+# generator reading ADC data chunk by chunk into DataFrames, so memory
+# use does not depend on the length of the file
+def iterDataFrames(reader, channels=None, start_time=0, end_time=None,
+                   az_time=True, scaled=False, chunk_size=ADC_CHUNK_SCANS):
+    """Yields the ADC data as pandas DataFrames of up to 'chunk_size'
+    scans, see CODASReader.iterDataFrames"""
+    channels = reader._getChannels(channels)
+    names = getChannelNames(reader, channels)
+    start_byte, scans = reader._getScanRange(start_time, end_time)
+    adc_scaling = np.array([reader.header[33 + channel][2]
+                            for channel in channels], dtype=float)
+    for first in range(0, scans, chunk_size):
+        chunk_scans = min(chunk_size, scans - first)
+        # every chunk gets its own array, since the DataFrames are not
+        # copied and may be kept by the caller
+        adc_data = np.empty([chunk_scans, len(channels)], dtype=np.int16)
+        reader._decodeADC(start_byte + first * 2 * reader.acq_channels,
+                          chunk_scans, channels, adc_data)
+        yield _createDataFrame(reader, adc_data, channels, names,
+                               adc_scaling, start_time, first, az_time,
+                               scaled)
+
+
+# reads ADC data into a labelled xarray DataArray
+def toXArray(reader, channels=None, start_time=0, end_time=None,
+             az_time=True, scaled=False):
+    """Returns ADC data as xarray DataArray, see CODASReader.toXArray"""
+    xarray = _importXArray()
+    adc_window = reader.getADC(channels, start_time, end_time)
+    adc_data = adc_window.adc_data
+    if scaled:
+        adc_data = adc_data * adc_window.adc_scaling
+        adc_scaling = np.ones(len(adc_window.channels))
+    else:
+        adc_scaling = adc_window.adc_scaling
+    return xarray.DataArray(
+        adc_data, dims=("time", "channel"),
+        coords={"time": getTimeIndex(reader, start_time, 0, len(adc_data),
+                                     az_time),
+                "channel": adc_window.channels,
+                "name": ("channel",
+                         getChannelNames(reader, adc_window.channels)),
+                "scaling": ("channel", adc_scaling)},
+        attrs={"file": str(reader.location),
+               "time_between_samples": reader.header[12]})
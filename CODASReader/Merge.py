@@ -0,0 +1,158 @@
+import numpy as np
+from .CODASReader import (ADC_CHUNK_SCANS, createTimeStamps, writeCSVHeader,
+                          writeCSVRows)
+
+
+# returns the start (seconds since epoch), number of scans and time
+# between scans of the common time base of all readers.
+# The common time base covers the time in which all instruments were
+# recording
+def getCommonTimeBase(readers, time_between_samples=None):
+    """Returns (start, scans, time_between_samples) of the time base
+    shared by all readers"""
+    if len(readers) == 0:
+        raise ValueError("At least one reader is needed for merging")
+    for reader in readers:
+        if len(reader.header) == 0:
+            raise RuntimeError("Header has not been read or is empty"
+                               + "Use 'readHeader' to read header")
+    # self.header[13] stores the time of start of measurement and
+    # self.header[12] the time between samples of each reader
+    start = max(reader.header[13] for reader in readers)
+    end = min(reader.header[13] + reader._getScanCount() * reader.header[12]
+              for reader in readers)
+    if time_between_samples is None:
+        time_between_samples = min(reader.header[12] for reader in readers)
+    if time_between_samples <= 0:
+        raise ValueError("time_between_samples must be positive")
+    scans = max(0, int((end - start) / time_between_samples))
+    return start, scans, time_between_samples
+
+
+# generator merging the ADC data of several readers onto a common time
+# base chunk by chunk, so memory use does not depend on the length of
+# the recordings
+def iterMergedADC(readers, channels=None, time_between_samples=None,
+                  method="nearest", chunk_size=ADC_CHUNK_SCANS):
+    """param readers : list of CODASReader \n
+        Readers of the files recorded at the same time, their headers
+        must be read \n
+    param channels : list, optional \n
+        Channels to read for each reader (int, list of int or None for
+        all acquired channels). Default is all channels of all readers \n
+    param time_between_samples : float, optional \n
+        Time between two scans of the merged data in seconds.
+        Default is the smallest time between samples of all readers \n
+    param method : str, optional \n
+        'nearest' takes the data point closest in time of each reader,
+        'linear' interpolates linearly between the two closest data
+        points. Default is 'nearest' \n
+    param chunk_size : int, optional \n
+        Maximum number of scans read from any reader at once \n
+    Yields (first, adc_data) for consecutive chunks of the merged data,
+    where 'first' is the number of the first merged scan in the chunk.
+    The data of all readers is in consecutive columns, with the
+    columns of the first reader first. 'nearest' gives int16 data,
+    'linear' float data, both without scaling factor applied.
+    Use getCommonTimeBase for the start time of the merged data."""
+    if method not in ("nearest", "linear"):
+        raise ValueError("Unknown merge method: " + str(method)
+                         + " (expected 'nearest' or 'linear')")
+    if channels is None:
+        channels = [None] * len(readers)
+    if len(channels) != len(readers):
+        raise ValueError("One list of channels is needed per reader")
+    channels = [reader._getChannels(reader_channels)
+                for reader, reader_channels in zip(readers, channels)]
+    start, scans, time_between_samples = getCommonTimeBase(
+        readers, time_between_samples)
+    # limiting the merged scans per chunk so no reader has to read more
+    # than chunk_size scans for a chunk
+    chunk_scans = max(1, int(chunk_size * min(
+        reader.header[12] for reader in readers) / time_between_samples))
+    if method == "nearest":
+        dtype = np.int16
+    else:
+        dtype = np.float64
+    columns = sum(len(reader_channels) for reader_channels in channels)
+    for first in range(0, scans, chunk_scans):
+        scans_in_chunk = min(chunk_scans, scans - first)
+        # times relative to the start of the merged data, absolute times
+        # in seconds since epoch would lose precision
+        times = (first + np.arange(scans_in_chunk)) * time_between_samples
+        adc_data = np.empty([scans_in_chunk, columns], dtype=dtype)
+        column = 0
+        for reader, reader_channels in zip(readers, channels):
+            last_scan = reader._getScanCount() - 1
+            # position of each merged scan in the scans of this reader
+            position = ((times + (start - reader.header[13]))
+                        / reader.header[12])
+            if method == "nearest":
+                index = np.clip(np.rint(position).astype(np.int64),
+                                0, last_scan)
+            else:
+                # positions that only miss a scan by rounding errors
+                # are moved onto the scan
+                nearest = np.rint(position)
+                position = np.where(np.abs(position - nearest) < 1e-6,
+                                    nearest, position)
+                index = np.clip(np.floor(position).astype(np.int64),
+                                0, last_scan)
+            # reading all scans of this reader in the chunk at once
+            first_scan = int(index[0])
+            read_scans = min(int(index[-1]) + 2, last_scan + 1) - first_scan
+            reader_data = reader._readScans(first_scan, read_scans,
+                                            reader_channels)
+            index -= first_scan
+            columns_end = column + len(reader_channels)
+            if method == "nearest":
+                adc_data[:, column:columns_end] = reader_data[index]
+            else:
+                following = np.minimum(index + 1, read_scans - 1)
+                weight = np.clip(position - (index + first_scan),
+                                 0, 1)[:, None]
+                adc_data[:, column:columns_end] = (
+                    reader_data[index] * (1 - weight)
+                    + reader_data[following] * weight)
+            column = columns_end
+        yield first, adc_data
+
+
+# merges several files and saves the result in the CSV format of
+# CODASReader.saveADCsToCSV
+def mergeADCsToCSV(readers, name, channels=None, time_between_samples=None,
+                   method="nearest", delim=",", header=[], az_time=True,
+                   chunk_size=ADC_CHUNK_SCANS):
+    """param readers : list of CODASReader \n
+    param name : str \n
+        Name of the CSV file the output will be saved to \n
+    param channels, time_between_samples, method, chunk_size : optional \n
+        See 'iterMergedADC' \n
+    param delim, header : optional \n
+        See CODASReader.saveADCsToCSV \n
+    param az_time : bool, optional \n
+        Decides whether the time stamps are in UTC or in Arizona
+        local time. Default is True (Arizona time) \n
+    Merges the ADC data of files recorded at the same time onto a
+    common time base and saves it to a CSV file, reading the files
+    chunk by chunk. \n
+    The channel line of the CSV file gives 'reader number:channel
+    number' for each column, the scaling line the scaling factor of
+    the channel the column came from."""
+    if channels is None:
+        channels = [None] * len(readers)
+    column_names = []
+    adc_scaling = []
+    for number, reader in enumerate(readers):
+        for channel in reader._getChannels(channels[number]):
+            column_names.append(str(number) + ":" + str(channel))
+            adc_scaling.append(reader.header[33 + channel][2])
+    start, scans, time_between_samples = getCommonTimeBase(
+        readers, time_between_samples)
+    with open(name, "w", newline="\n") as file:
+        writeCSVHeader(file, delim, header, column_names, adc_scaling)
+        for first, adc_data in iterMergedADC(
+                readers, channels, time_between_samples, method, chunk_size):
+            time_stamps = createTimeStamps(start, 0, first, len(adc_data),
+                                           time_between_samples, az_time)
+            writeCSVRows(file, delim, adc_data, time_stamps)
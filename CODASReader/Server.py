@@ -0,0 +1,282 @@
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+from .BlockCache import BLOCK_CACHE_SIZE, BLOCK_SCANS, BlockCache
+from .CODASReader import CODASReader
+
+# default maximum number of scans returned by a single /window request
+MAX_WINDOW_SCANS = 1000000
+# default maximum number of files kept open at once
+MAX_OPEN_READERS = 64
+
+
+# converts header and trailer elements into types that can be written
+# as JSON (tuples become lists, dictionary keys become strings)
+def _toJSON(value):
+    """Returns 'value' with all elements converted for JSON"""
+    if isinstance(value, (list, tuple)):
+        return [_toJSON(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _toJSON(item) for key, item in value.items()}
+    return value
+
+
+class CODASServer(ThreadingHTTPServer):
+    """Local HTTP server for the header, trailer and ADC data of the
+    CODAS files in the directory 'root'. \n
+    All files share one BlockCache, so data requested repeatedly is
+    only decoded once. Each file is kept open by one reader that
+    serves all requests for it, the 'max_readers' most recently used
+    files are kept open. \n
+    Requests (all answers are JSON unless stated otherwise): \n
+        /metadata?file=F : header information, see
+            CODASReader.getMetadata \n
+        /header?file=F : the file header \n
+        /trailer?file=F : the file trailer \n
+        /window?file=F&start=S&end=E&channels=0,1&format=json : ADC data
+            between S and E seconds since start of data acquesition
+            (default: all data) of the given channels (default: all).
+            format=npy returns the data as .npy file instead of JSON.
+            scaled=1 applies the scaling factors. Windows of more than
+            'max_scans' scans are refused, longer data has to be
+            requested in several windows \n
+        /stats : statistics of the block cache \n
+    param root : str \n
+        Directory the files are served from \n
+    param address : tuple, optional \n
+        Host and port the server listens on
+        (default: ('127.0.0.1', 8000)) \n
+    param cache_size : int, optional \n
+        Maximum memory used by the block cache in bytes \n
+    param block_scans : int, optional \n
+        Number of scans per cached block \n
+    param max_scans : int, optional \n
+        Maximum number of scans of a /window request
+        (default: 1000000) \n
+    param max_readers : int, optional \n
+        Maximum number of files kept open at once (default: 64)"""
+
+    daemon_threads = True
+
+    def __init__(self, root, address=("127.0.0.1", 8000),
+                 cache_size=BLOCK_CACHE_SIZE, block_scans=BLOCK_SCANS,
+                 max_scans=MAX_WINDOW_SCANS, max_readers=MAX_OPEN_READERS):
+        if max_readers < 1:
+            raise ValueError("max_readers must be at least 1")
+        self.root = os.path.realpath(root)
+        self.max_scans = max_scans
+        self.max_readers = max_readers
+        self.block_cache = BlockCache(cache_size, block_scans)
+        # open readers by location, least recently used first
+        self._readers = OrderedDict()
+        self._readers_lock = threading.Lock()
+        super().__init__(address, CODASRequestHandler)
+
+    # context manager giving the open reader for the file 'name' in the
+    # root directory. A new reader is opened if the file was changed, and
+    # the least recently used readers are closed once more than
+    # max_readers are open.
+    # Replaced and dropped readers are only closed once no request uses
+    # them anymore, so a file descriptor is never closed during a read
+    @contextmanager
+    def useReader(self, name):
+        """Yields a reader for the file 'name' relative to the root"""
+        location = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([self.root, location]) != self.root:
+            raise PermissionError("File is outside of the served directory: "
+                                  + name)
+        try:
+            file_status = os.stat(location)
+        except FileNotFoundError:
+            # the reader of a deleted file is not needed anymore
+            with self._readers_lock:
+                entry = self._readers.pop(location, None)
+                if entry is not None:
+                    self._retireReader(entry)
+            raise
+        key = (file_status.st_size, file_status.st_mtime_ns)
+        with self._readers_lock:
+            entry = self._getReaderEntry(location, key)
+        if entry is None:
+            # the new reader is opened without holding the lock, since
+            # reading the trailer of a compressed file decompresses it
+            reader = CODASReader(location, block_cache=self.block_cache)
+            try:
+                reader.open()
+                reader.readTrailer()
+            except BaseException:
+                reader.close()
+                raise
+            with self._readers_lock:
+                entry = self._getReaderEntry(location, key)
+                if entry is None:
+                    entry = self._addReader(location, key, reader)
+                else:
+                    # another request opened the file in the meantime
+                    reader.close()
+        try:
+            yield entry["reader"]
+        finally:
+            with self._readers_lock:
+                entry["users"] -= 1
+                if entry["retired"] and entry["users"] == 0:
+                    entry["reader"].close()
+
+    # returns the entry of the open reader of 'location' for the file
+    # version 'key' with one more user, or None if there is none.
+    # Must be called with _readers_lock held
+    def _getReaderEntry(self, location, key):
+        """Returns the entry of a matching open reader or None"""
+        entry = self._readers.get(location)
+        if entry is None or entry["key"] != key:
+            return None
+        self._readers.move_to_end(location)
+        entry["users"] += 1
+        return entry
+
+    # stores the new 'reader' of 'location', replacing an older reader of
+    # the file, and drops the least recently used readers beyond
+    # max_readers. Must be called with _readers_lock held
+    def _addReader(self, location, key, reader):
+        """Returns the entry of the new reader with one user"""
+        entry = self._readers.pop(location, None)
+        if entry is not None:
+            self._retireReader(entry)
+        entry = {"key": key, "reader": reader, "users": 1, "retired": False}
+        self._readers[location] = entry
+        while len(self._readers) > self.max_readers:
+            self._retireReader(self._readers.popitem(last=False)[1])
+        return entry
+
+    # marks a reader that is no longer served and closes it if no
+    # request uses it. Must be called with _readers_lock held
+    def _retireReader(self, entry):
+        """Closes the reader of 'entry' once it is no longer used"""
+        entry["retired"] = True
+        if entry["users"] == 0:
+            entry["reader"].close()
+
+    def server_close(self):
+        super().server_close()
+        with self._readers_lock:
+            for entry in self._readers.values():
+                self._retireReader(entry)
+            self._readers.clear()
+
+
+class CODASRequestHandler(BaseHTTPRequestHandler):
+    """Answers the requests of a CODASServer"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1]
+                 for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/stats":
+                self._sendJSON(self.server.block_cache.getStats())
+                return
+            if "file" not in query:
+                self._sendError(400, "Missing argument 'file'")
+                return
+            with self.server.useReader(query["file"]) as reader:
+                if url.path == "/metadata":
+                    self._sendJSON(reader.getMetadata())
+                elif url.path == "/header":
+                    self._sendJSON(_toJSON(reader.header))
+                elif url.path == "/trailer":
+                    self._sendJSON(_toJSON(reader.trailer))
+                elif url.path == "/window":
+                    self._sendWindow(reader, query)
+                else:
+                    self._sendError(404, "Unknown request: " + url.path)
+        except (FileNotFoundError, PermissionError) as error:
+            self._sendError(404, str(error))
+        except (ValueError, IndexError) as error:
+            self._sendError(400, str(error))
+        except Exception as error:
+            self._sendError(500, str(error))
+
+    # sends the ADC data between the requested times for the requested
+    # channels
+    def _sendWindow(self, reader, query):
+        """Sends ADC data as JSON or .npy file"""
+        channels = None
+        if query.get("channels"):
+            channels = [int(channel)
+                        for channel in query["channels"].split(",")]
+        start_time = float(query.get("start", 0))
+        end_time = None
+        if query.get("end"):
+            end_time = float(query["end"])
+        scaled = query.get("scaled", "0") not in ("0", "false", "")
+        # the size of the window is checked before anything is decoded,
+        # so a single request cannot use unlimited memory
+        scans = reader._getScanRange(start_time, end_time)[1]
+        if scans > self.server.max_scans:
+            self._sendError(400, "Window of " + str(scans)
+                            + " scans is larger than the maximum of "
+                            + str(self.server.max_scans)
+                            + " scans, request a shorter time frame")
+            return
+        adc_window = reader.getADC(channels, start_time, end_time,
+                                   save_memory=not scaled)
+        output_format = query.get("format", "json")
+        if output_format == "npy":
+            body = io.BytesIO()
+            np.save(body, adc_window.adc_data)
+            self._send(200, body.getvalue(), "application/octet-stream", {
+                "X-Channels": ",".join(
+                    str(channel) for channel in adc_window.channels),
+                "X-Scaling": ",".join(
+                    repr(float(item)) for item in adc_window.adc_scaling),
+                "X-Start-Time": repr(start_time),
+                "X-Time-Between-Samples": repr(reader.header[12])})
+        elif output_format == "json":
+            self._sendJSON({
+                "channels": adc_window.channels.tolist(),
+                "adc_scaling": adc_window.adc_scaling.tolist(),
+                "start_time": start_time,
+                "time_between_samples": reader.header[12],
+                "adc_data": adc_window.adc_data.tolist()})
+        else:
+            self._sendError(400, "Unknown format: " + output_format)
+
+    def _sendJSON(self, value):
+        self._send(200, json.dumps(value).encode(), "application/json")
+
+    def _sendError(self, code, message):
+        self._send(code, json.dumps({"error": message}).encode(),
+                   "application/json")
+
+    def _send(self, code, body, content_type, headers={}):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    # keeping the console free of a line per request
+    def log_message(self, format, *args):
+        pass
+
+
+# starts a CODASServer and serves requests until interrupted
+def serve(root, host="127.0.0.1", port=8000, cache_size=BLOCK_CACHE_SIZE,
+          block_scans=BLOCK_SCANS, max_scans=MAX_WINDOW_SCANS,
+          max_readers=MAX_OPEN_READERS):
+    """Serves the CODAS files in 'root' until interrupted,
+    see CODASServer"""
+    with CODASServer(root, (host, port), cache_size, block_scans,
+                     max_scans, max_readers) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,190 @@
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+
+# held while the resource tracker is switched off for attaching and while
+# new blocks are created, so blocks created by other threads are always
+# registered
+_tracker_lock = threading.Lock()
+
+
+# attaches to an existing shared memory block without registering it
+# with the resource tracker of this process. Otherwise the block would be
+# destroyed as soon as the first process that attached to it exits
+def _attachSharedMemory(name):
+    """Returns the existing shared memory block 'name'"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedADC:
+    """Handle to ADC data that was decoded into shared memory
+    (or a memory mapped temporary file) so it can be used by several
+    processes without copying it. \n
+    The handle is small and can be passed to other processes, e.g. as
+    argument of multiprocessing.Process or a Pool. Each process then
+    calls 'attach' to get a numpy array of the data. \n
+    The handle is created by CODASReader.readADCShared, the process
+    that created it owns the data and must call 'unlink' (or use the
+    handle as context manager) once all processes are finished with it.
+    Other processes call 'close' once they no longer need the data. \n
+    Attributes: \n
+        channels : list of the channel numbers in the columns of the data \n
+        adc_scaling : scaling factor for each column (all 1.0 if
+            the data was decoded with save_memory = False) \n
+        start_time : time of the first scan in seconds since start of
+            data acquesition \n
+        time_between_samples : time between two scans in seconds \n
+        acq_time : start of data acquesition in seconds since epoch"""
+
+    def __init__(self, name, shape, dtype, channels, adc_scaling,
+                 start_time, time_between_samples, acq_time,
+                 backend="shm"):
+        if backend not in ("shm", "memmap"):
+            raise ValueError("Unknown backend for shared ADC data: "
+                             + str(backend)
+                             + " (expected 'shm' or 'memmap')")
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype).str
+        self.channels = list(channels)
+        self.adc_scaling = list(adc_scaling)
+        self.start_time = start_time
+        self.time_between_samples = time_between_samples
+        self.acq_time = acq_time
+        self.backend = backend
+        self._owner = False
+        self._buffer = None
+        self._array = None
+
+    # creates a new block of shared memory (or temporary file) large
+    # enough for the data and returns a handle that owns it
+    @classmethod
+    def create(cls, shape, dtype, channels, adc_scaling, start_time,
+               time_between_samples, acq_time, backend="shm",
+               directory=None):
+        """Creates new shared storage for ADC data of 'shape' and 'dtype'
+        and returns a handle owning it. \n
+        param backend : str, optional \n
+            'shm' for multiprocessing.shared_memory (default) or
+            'memmap' for a memory mapped temporary file \n
+        param directory : str, optional \n
+            directory of the temporary file for the 'memmap' backend
+            (default: the system's temporary directory)"""
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        if backend == "shm":
+            with _tracker_lock:
+                buffer = shared_memory.SharedMemory(create=True, size=size)
+            name = buffer.name
+        else:
+            file_descriptor, name = tempfile.mkstemp(
+                suffix=".adc", prefix="codas-", dir=directory)
+            os.ftruncate(file_descriptor, size)
+            os.close(file_descriptor)
+            buffer = None
+        handle = cls(name, shape, dtype, channels, adc_scaling, start_time,
+                     time_between_samples, acq_time, backend)
+        handle._owner = True
+        handle._buffer = buffer
+        return handle
+
+    # only the description of the data is passed on to other processes,
+    # they attach to the data themselves
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_owner"] = False
+        state["_buffer"] = None
+        state["_array"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+    # attaching to the data in this process.
+    # Returns the same array if called repeatedly
+    def attach(self):
+        """Returns the shared ADC data as a numpy array without
+        copying it. \n
+        Changes to the array are seen by all processes. The array
+        keeps the shared memory mapped, 'close' and 'unlink' raise a
+        BufferError as long as it (or a view of it) is in use."""
+        if self._array is not None:
+            return self._array
+        if self.backend == "shm":
+            if self._buffer is None:
+                self._buffer = _attachSharedMemory(self.name)
+            # frombuffer exports the buffer, so the shared memory cannot
+            # be unmapped while the array is still in use. The block may
+            # be larger than the data (it is rounded up to whole pages)
+            self._array = np.frombuffer(
+                self._buffer.buf, dtype=self.dtype,
+                count=int(np.prod(self.shape))).reshape(self.shape)
+        else:
+            self._array = np.memmap(self.name, dtype=self.dtype,
+                                    mode="r+", shape=self.shape)
+        return self._array
+
+    # return the time of each scan in seconds since start of data
+    # acquesition
+    def getTimes(self):
+        """Returns the time of each scan in seconds since start of
+        data acquesition"""
+        return (self.start_time
+                + np.arange(self.shape[0]) * self.time_between_samples)
+
+    # detaching this process from the data.
+    # The shared memory stays mapped if arrays returned by attach are
+    # still in use
+    def close(self):
+        """Detaches this process from the shared ADC data. \n
+        Raises a BufferError if arrays returned by 'attach' are still in
+        use, delete them first."""
+        self._array = None
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    # detaching from and destroying the data.
+    # should only be called by the owner once all other processes have
+    # closed their handles
+    def unlink(self):
+        """Detaches from and frees the shared ADC data. \n
+        This should only be called by the process that created the
+        data, once no other process uses it anymore. Like 'close' it
+        raises a BufferError if arrays returned by 'attach' are still in
+        use in this process, the data is then freed once they are
+        deleted."""
+        if self.backend == "shm":
+            if self._buffer is None:
+                self._buffer = _attachSharedMemory(self.name)
+            buffer = self._buffer
+            # the block is unlinked even if it cannot be unmapped yet, so
+            # it is never leaked
+            try:
+                self.close()
+            finally:
+                buffer.unlink()
+        else:
+            self.close()
+            try:
+                os.remove(self.name)
+            except FileNotFoundError:
+                pass
+        self._owner = False
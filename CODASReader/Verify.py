@@ -0,0 +1,202 @@
+import os
+import struct
+from collections import deque
+try:
+    from .CODASReader import CODASReader
+except ImportError:
+    # running CODASReader.py directly from the command line
+    from CODASReader import CODASReader
+
+# allowed difference in seconds between the duration given by the number
+# of samples and the times the file was opened and the trailer written
+DURATION_TOLERANCE = 2
+
+
+# returns the event marker pointers of the first part of the trailer as
+# stored in the file. readTrailer converts them with abs() into times,
+# which hides pointers outside of the ADC data
+def _readMarkerPointers(reader, channels_hiRes):
+    """Returns the raw event marker pointers of the trailer"""
+    # self.header[6] stores the number of bytes in trailer part 1,
+    # which directly follows the ADC data
+    bin_data = reader._readBytes(reader.header[4] + reader.adc_data_bytes,
+                                 reader.header[6])
+    trailer_longs = struct.unpack("<" + str(len(bin_data) // 4) + "l",
+                                  bin_data[:len(bin_data) // 4 * 4])
+    pointers = []
+    marker = True
+    time_stamp = False
+    # same order as in readTrailer: marker pointer, time and date stamp
+    # if the pointer is not negative, comment pointer if the next long
+    # is below -header[5] / (2 * channels)
+    for trailer_long in trailer_longs:
+        if marker:
+            pointers.append(trailer_long)
+            marker = False
+            time_stamp = trailer_long >= 0
+        elif time_stamp:
+            time_stamp = False
+        elif trailer_long > -1 * reader.header[5] / (2 * channels_hiRes):
+            pointers.append(trailer_long)
+            time_stamp = trailer_long >= 0
+        else:
+            marker = True
+    return pointers
+
+
+# checks the consistency of a single file by reading its header and
+# trailer. The ADC data itself is never read
+def verifyFile(location):
+    """param location : str or file-like object \n
+    Checks a CODAS file for truncation and corruption by reading
+    only its header and trailer. \n
+    Compressed files with a single seek point (compressed by the
+    standard gzip / zstd tools) are decompressed twice, once to build
+    their index and once to reach the trailer. Files written by
+    'compressFile' only decompress the blocks that are read. \n
+    Returns a dictionary with the file location, whether the file
+    passed all checks ('ok') and lists of 'errors' and 'warnings'. \n
+    The following is checked: \n
+        the header control word (8001H) \n
+        the file is long enough for header, ADC data and trailer \n
+        the number of ADC data bytes is a whole number of scans \n
+        the number of ADC data bytes matches the recorded duration
+        (only for files that are not packed, since packed files store
+        each channel at its own rate) \n
+        the sample rate divisors of packed files \n
+        the event markers of the trailer lie within the ADC data"""
+    report = {"file": str(location), "ok": False, "errors": [],
+              "warnings": []}
+    errors = report["errors"]
+    warnings = report["warnings"]
+    try:
+        reader = CODASReader(location, read_header=False)
+    except Exception as error:
+        errors.append("File could not be opened: " + str(error))
+        return report
+    with reader:
+        report["bytes_in_file"] = reader.bytes_in_file
+        try:
+            reader.readHeader()
+        except ZeroDivisionError:
+            errors.append("Header contains a channel information length "
+                          + "or sample rate divisor of 0")
+            return report
+        except Exception as error:
+            errors.append("Header could not be read: "
+                          + str(error).strip())
+            return report
+        header = reader.header
+
+        if reader.acq_channels < 1:
+            errors.append("Header gives no acquired channels")
+            return report
+        if header[12] <= 0:
+            errors.append("Header gives time between samples of "
+                          + str(header[12]) + " s")
+            return report
+
+        # header[33 + channel][6] gives the sample rate divisor of
+        # each channel, which must be positive in packed files
+        if reader.packed:
+            for channel in range(reader.acq_channels):
+                if 33 + channel >= len(header) - 1:
+                    errors.append("Header has no channel information "
+                                  + "for channel " + str(channel))
+                elif header[33 + channel][6] < 1:
+                    errors.append("Invalid sample rate divisor for "
+                                  + "channel " + str(channel) + ": "
+                                  + str(header[33 + channel][6]))
+            if errors:
+                return report
+
+        # header[4] bytes of header, adc_data_bytes of ADC data,
+        # header[6] bytes of event markers and header[7] bytes of user
+        # annotations must all be in the file, event marker comments
+        # take up the remaining bytes
+        expected_bytes = (header[4] + reader.adc_data_bytes + header[6]
+                          + header[7])
+        report["expected_bytes"] = expected_bytes
+        if expected_bytes > reader.bytes_in_file:
+            errors.append("File is truncated: header, ADC data and "
+                          + "trailer need " + str(expected_bytes)
+                          + " bytes, file has "
+                          + str(reader.bytes_in_file))
+            return report
+
+        # every scan stores one data point of every channel
+        # in unpacked files. In packed files header[5] gives the number
+        # of bytes before packing, from which the packed length is
+        # calculated with the sample rate divisors
+        scans = reader.adc_data_bytes / (2 * reader.acq_channels)
+        if header[5] % (2 * reader.acq_channels) != 0:
+            errors.append("ADC data length of " + str(header[5])
+                          + " bytes is not a whole number of scans of "
+                          + str(reader.acq_channels) + " channels")
+        if not reader.packed:
+            # header[13] and header[14] store the times the file was
+            # opened and the trailer was written
+            duration = scans * header[12]
+            if (header[14] >= header[13]
+                    and abs(duration - (header[14] - header[13]))
+                    > DURATION_TOLERANCE):
+                warnings.append("Duration of ADC data ("
+                                + "{:.1f}".format(duration)
+                                + " s) does not match recording time ("
+                                + str(header[14] - header[13]) + " s)")
+
+        try:
+            reader.readTrailer()
+        except Exception as error:
+            errors.append("Trailer could not be read: " + str(error))
+            return report
+        # event marker pointers must lie within the ADC data.
+        # The pointers count data points of all channels (of one
+        # channel in hiRes files), header[5] gives the ADC data bytes
+        if reader.hiRes:
+            channels_hiRes = 1
+        else:
+            channels_hiRes = reader.acq_channels
+        for pointer in _readMarkerPointers(reader, channels_hiRes):
+            if abs(pointer) * 2 * channels_hiRes > header[5]:
+                errors.append("Event marker pointer " + str(pointer)
+                              + " lies outside of the ADC data")
+        for marker in reader.trailer[0]:
+            if len(marker) > 2 and marker[2] not in reader.trailer[2]:
+                warnings.append("Comment of event marker at "
+                                + "{:.4f}".format(marker[0])
+                                + " s not found in trailer")
+    report["ok"] = not errors
+    return report
+
+
+# checks many files in parallel and yields their reports in the order
+# of 'locations'. Only a limited number of files is checked ahead, so
+# 'locations' can be a generator over a whole archive
+def verifyFiles(locations, workers=None, processes=False):
+    """param locations : iterable of str \n
+        Locations of the files that should be checked \n
+    param workers : int, optional \n
+        Number of files checked at once
+        (default: 4 times the number of CPUs) \n
+    param processes : bool, optional \n
+        Decides whether the files are checked in separate processes
+        instead of threads (default: False). Threads are usually
+        sufficient since checking a file mostly waits for the disk. \n
+    Yields the report of 'verifyFile' for each file in the order of
+    'locations'."""
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    if workers is None:
+        workers = 4 * (os.cpu_count() or 1)
+    if processes:
+        executor = ProcessPoolExecutor(workers)
+    else:
+        executor = ThreadPoolExecutor(workers)
+    with executor:
+        pending = deque()
+        for location in locations:
+            pending.append(executor.submit(verifyFile, location))
+            if len(pending) >= 4 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -1 +1,27 @@
 from .CODASReader import CODASReader
+from .CompressedFile import CompressedFile, compressFile
+from .BlockCache import BlockCache
+
+# classes and functions that depend on numpy are only imported when they
+# are first used, so importing the package stays fast for reading header
+# information
+_lazy_attributes = {"SharedADC": ".SharedADC",
+                    "verifyFile": ".Verify",
+                    "verifyFiles": ".Verify",
+                    "CheckpointedFile": ".Export",
+                    "CODASServer": ".Server",
+                    "serve": ".Server",
+                    "getCommonTimeBase": ".Merge",
+                    "iterMergedADC": ".Merge",
+                    "mergeADCsToCSV": ".Merge"}
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        import importlib
+        value = getattr(importlib.import_module(_lazy_attributes[name],
+                                                __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + repr(__name__)
+                         + " has no attribute " + repr(name))
@@ -3,18 +3,114 @@
 # only runs if program is run directly from file
 if __name__ == "__main__":
     from CODASReader import CODASReader
+    import os
     import sys
     import traceback
     import argparse
+    import contextlib
+
+    # 'codas.py verify ...' checks files for truncation and corruption
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        import json
+        from CODASReader import verifyFiles
+        desc = """Check CODAS files for truncation and corruption by reading
+        their header and trailer. One line of JSON is printed per file,
+        the exit code is 1 if any file failed a check."""
+        parser = argparse.ArgumentParser(
+            prog="codas.py verify", description=desc,
+            formatter_class=argparse.MetavarTypeHelpFormatter)
+        parser.add_argument("file", type=str, nargs="*")
+        parser.add_argument("-l", "--fileList", type=str,
+                            help="""File containing the locations of the
+                            files to check, one per line ('-' for stdin)""")
+        parser.add_argument("-w", "--workers", type=int,
+                            help="""Number of files checked at once
+                            (default: 4 times the number of CPUs)""")
+        parser.add_argument("-P", "--processes", action="store_true",
+                            help="Check files in processes instead of threads")
+        parser.add_argument("-q", "--quiet", action="store_true",
+                            help="Only print files that failed a check")
+        input_args = parser.parse_args(sys.argv[2:])
+
+        # reading the list of files lazily so very long lists are
+        # never held in memory
+        def locations():
+            for location in input_args.file:
+                yield location
+            if input_args.fileList:
+                if input_args.fileList == "-":
+                    file_list = sys.stdin
+                else:
+                    file_list = open(input_args.fileList, "r")
+                with file_list:
+                    for line in file_list:
+                        if line.strip():
+                            yield line.rstrip("\r\n")
+
+        exit_code = 0
+        for report in verifyFiles(locations(), workers=input_args.workers,
+                                  processes=input_args.processes):
+            if not report["ok"]:
+                exit_code = 1
+            elif input_args.quiet:
+                continue
+            sys.stdout.write(json.dumps(report) + "\n")
+        sys.exit(exit_code)
+
+    # 'codas.py serve ...' serves files over HTTP from a local server
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        desc = """Serve the header, trailer and ADC data of the CODAS files
+        in a directory over HTTP. Decoded ADC data is kept in a memory
+        limited cache shared by all files. Requests: /metadata?file=F,
+        /header?file=F, /trailer?file=F, /window?file=F&start=S&end=E
+        &channels=0,1&format=json|npy&scaled=0|1 and /stats."""
+        parser = argparse.ArgumentParser(
+            prog="codas.py serve", description=desc,
+            formatter_class=argparse.MetavarTypeHelpFormatter)
+        parser.add_argument("-d", "--directory", type=str, default=".",
+                            help="Directory the files are served from "
+                            + "(default: current directory)")
+        parser.add_argument("--host", type=str, default="127.0.0.1",
+                            help="Host to listen on (default: 127.0.0.1)")
+        parser.add_argument("-p", "--port", type=int, default=8000,
+                            help="Port to listen on (default: 8000)")
+        parser.add_argument("-m", "--cacheSize", type=float, default=256,
+                            help="Memory used by the cache in MB "
+                            + "(default: 256)")
+        parser.add_argument("-b", "--blockScans", type=int, default=65536,
+                            help="Number of scans per cached block "
+                            + "(default: 65536)")
+        parser.add_argument("-w", "--maxScans", type=int, default=1000000,
+                            help="Maximum number of scans returned by one "
+                            + "/window request (default: 1000000)")
+        parser.add_argument("-f", "--maxFiles", type=int, default=64,
+                            help="Maximum number of files kept open at "
+                            + "once (default: 64)")
+        input_args = parser.parse_args(sys.argv[2:])
+        from CODASReader import serve
+        serve(input_args.directory, input_args.host, input_args.port,
+              int(input_args.cacheSize * 1024 * 1024),
+              input_args.blockScans, input_args.maxScans,
+              input_args.maxFiles)
+        sys.exit()
+
     desc = """Read CODAS files and translate them to ASCII. The result
     will be separated into the file header, the adc data and the file
     trailer. The header and trailer can be printed to the console and
-    the adc data can be saved as a csv file."""
+    the adc data can be saved as a csv file.
+    Use 'codas.py verify -h' for checking files for corruption and
+    'codas.py serve -h' for serving files over HTTP."""
     # setting up argparse with all needed arguments
     parser = argparse.ArgumentParser(
         description=desc,
         formatter_class=argparse.MetavarTypeHelpFormatter)
-    parser.add_argument("file", type=str)
+    parser.add_argument("file", type=str, nargs="+",
+                        help="""One or more CODAS files. Only one file can
+                        be given when the ADC data is saved, '-' writes
+                        the ADC data to stdout ('codas.py -s - file')""")
+    parser.add_argument("-j", "--json", action="store_true",
+                        help="""Print information from the header of
+                        every file given as one line of JSON per file""")
     parser.add_argument("-H", "--header", action="store_true",
                         help="Print header of CODAS file")
     parser.add_argument("-t", "--trailer", action="store_true",
@@ -28,7 +124,8 @@ if __name__ == "__main__":
     parser.add_argument("-a", "--acqChannels", action="store_true",
                         help="Print number of acquired channels")
     parser.add_argument("-s", "--saveADC", action="store_true",
-                        help="Save ADC data to csv, required for arguments below")
+                        help="""Save ADC data to csv, required for arguments
+                        below""")
     parser.add_argument("-c", "--channel", type=int, action="append",
                         help="Add a channel to be read (default: all)")
     parser.add_argument("-b", "--beginTime", type=float,
@@ -40,58 +137,137 @@ if __name__ == "__main__":
                         acquesition at which the last ADC data should
                         be read. (default: until last entry)""")
     parser.add_argument("-n", "--name", type=str,
-                        help="""Name for the produced ADC data csv file
-                        (default: 'name of file'.csv)""")
+                        help="""Name for the produced ADC data csv file,
+                        '-' for stdout (default: 'name of file'.csv)""")
     parser.add_argument("-f", "--fileHeader", type=str, action="append",
                         help="""Add an element to the header of the csv file
                         (default: Samples per second = 'sample rate')""")
-    input_args = parser.parse_args()
+    parser.add_argument("-o", "--outputFormat", type=str, default="csv",
+                        choices=["csv", "int16", "float32"],
+                        help="""Format of the saved ADC data: csv or raw
+                        interleaved little endian int16 (as stored in the
+                        file) or float32 (scaling factor applied) values
+                        without header (default: csv)""")
+    parser.add_argument("-m", "--maxMemory", type=float,
+                        help="""Maximum memory in MB used for saving the ADC
+                        data, which is then saved in smaller chunks
+                        (default: no limit)""")
+    parser.add_argument("--restart", action="store_true",
+                        help="""Start saving the ADC data from the beginning
+                        instead of continuing an interrupted conversion""")
+    # options may follow '-' and the file names in any order
+    input_args = parser.parse_intermixed_args()
+    # 'codas.py -s - file' writes the ADC data to stdout
+    if input_args.saveADC and "-" in input_args.file:
+        input_args.file.remove("-")
+        input_args.name = "-"
+        if not input_args.file:
+            parser.error("a CODAS file is needed with -s -")
+    if input_args.saveADC and len(input_args.file) > 1:
+        parser.error("only one file can be given with -s/--saveADC")
+
+    # printing header information of all files as JSON lines.
+    # Only the header of each file is read, the trailer and the ADC data
+    # are never touched
+    if input_args.json:
+        import json
+        exit_code = 0
+        for location in input_args.file:
+            try:
+                metadata = CODASReader(location).getMetadata()
+            except Exception as error:
+                metadata = {"file": location, "error": str(error)}
+                exit_code = 1
+            sys.stdout.write(json.dumps(metadata) + "\n")
+        sys.exit(exit_code)
 
-    # setting file location to entered file location and reading
-    # header and trailer first (header read automatically)
-    location = input_args.file
-    try:
-        codas_reader = CODASReader(location)
-        codas_reader.readTrailer()
-        channels = None
-        header = header = ["Samples per second = "
-                           + str(codas_reader.getSampleRate())]
-    except Exception:
-        traceback.print_exc()
-        sys.exit(1)
-    start_time = 0
-    end_time = None
-    name = location + ".csv"
-    # checking all possible command line arguments
-    if input_args.header:
-        codas_reader.printHeader()
-    if input_args.trailer:
-        codas_reader.printTrailer()
-    if input_args.printStartTime:
-        codas_reader.printAcqTime()
-    if input_args.duration:
-        codas_reader.printMeasurementTimeFrame()
-    if input_args.rate:
-        codas_reader.printSampleRate()
-    if input_args.acqChannels:
-        codas_reader.printAcqChannels()
-    if input_args.saveADC:
-        if input_args.channel:
-            channels = input_args.channel
-        if input_args.beginTime:
-            start_time = input_args.beginTime
-        if input_args.endTime:
-            end_time = input_args.endTime
-        if input_args.name:
-            name = input_args.name
-        if input_args.fileHeader:
-            header = input_args.fileHeader
+    for location in input_args.file:
+        # setting file location to entered file location and reading
+        # the header (read automatically), the trailer is only read
+        # when it is printed
         try:
-            # read and print ADC data with appropriate options
-            codas_reader.readADC(channels=channels, start_time=start_time,
-                                end_time=end_time)
-            codas_reader.saveADCsToCSV(name=name, header=header)
+            codas_reader = CODASReader(location)
+            if input_args.trailer:
+                codas_reader.readTrailer()
+            channels = None
+            header = ["Samples per second = "
+                      + str(codas_reader.getSampleRate())]
         except Exception:
             traceback.print_exc()
             sys.exit(1)
+        start_time = 0
+        end_time = None
+        if input_args.outputFormat == "csv":
+            name = location + ".csv"
+        else:
+            name = location + ".bin"
+        # with -s - stdout only carries the ADC data, everything else
+        # is printed to stderr
+        if input_args.saveADC and input_args.name == "-":
+            print_output = contextlib.redirect_stdout(sys.stderr)
+        else:
+            print_output = contextlib.nullcontext()
+        # checking all possible command line arguments
+        with print_output:
+            if input_args.header:
+                codas_reader.printHeader()
+            if input_args.trailer:
+                codas_reader.printTrailer()
+            if input_args.printStartTime:
+                codas_reader.printAcqTime()
+            if input_args.duration:
+                codas_reader.printMeasurementTimeFrame()
+            if input_args.rate:
+                codas_reader.printSampleRate()
+            if input_args.acqChannels:
+                codas_reader.printAcqChannels()
+        if input_args.saveADC:
+            if input_args.channel:
+                channels = input_args.channel
+            if input_args.beginTime:
+                start_time = input_args.beginTime
+            if input_args.endTime:
+                end_time = input_args.endTime
+            if input_args.name:
+                name = input_args.name
+            if input_args.fileHeader:
+                header = input_args.fileHeader
+            max_memory = None
+            if input_args.maxMemory:
+                max_memory = int(input_args.maxMemory * 1024 * 1024)
+            output_format = "csv"
+            dtype = "int16"
+            if input_args.outputFormat != "csv":
+                output_format = "binary"
+                dtype = input_args.outputFormat
+            try:
+                if name == "-":
+                    # stream ADC data chunk by chunk to stdout
+                    codas_reader.streamADC(
+                        sys.stdout.buffer, output_format, channels=channels,
+                        start_time=start_time, end_time=end_time,
+                        header=header, dtype=dtype, max_memory=max_memory)
+                elif output_format == "csv":
+                    # convert ADC data chunk by chunk with appropriate
+                    # options, an interrupted conversion is continued
+                    # when run again
+                    codas_reader.convertADCsToCSV(
+                        name=name, channels=channels, start_time=start_time,
+                        end_time=end_time, header=header,
+                        resume=not input_args.restart, max_memory=max_memory)
+                else:
+                    codas_reader.convertADCsToBinary(
+                        name=name, channels=channels, start_time=start_time,
+                        end_time=end_time, dtype=dtype,
+                        resume=not input_args.restart, max_memory=max_memory)
+            except BrokenPipeError:
+                # the reading end of the pipe was closed (e.g. by head).
+                # stdout is pointed to devnull so python does not fail
+                # again when flushing it at exit
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+                sys.exit(1)
+            except Exception:
+                traceback.print_exc()
+                sys.exit(1)
     sys.exit()
@@ -0,0 +1,52 @@
+import os
+import unittest
+
+import numpy as np
+
+from CODASReader import BlockCache, CODASReader
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+
+class CachedReadTest(unittest.TestCase):
+    """Reads through a BlockCache return the same data as uncached reads"""
+
+    def setUp(self):
+        self.reader = CODASReader(EXAMPLE_FILE)
+        self.cache = BlockCache(block_scans=5000)
+        self.cached_reader = CODASReader(EXAMPLE_FILE, block_cache=self.cache)
+
+    def checkWindow(self, **arguments):
+        window = self.reader.getADC(**arguments)
+        cached_window = self.cached_reader.getADC(**arguments)
+        np.testing.assert_array_equal(cached_window.adc_data,
+                                      window.adc_data)
+        np.testing.assert_array_equal(cached_window.adc_scaling,
+                                      window.adc_scaling)
+        np.testing.assert_array_equal(cached_window.channels,
+                                      window.channels)
+
+    def testWindows(self):
+        # windows inside one block, across blocks and of the whole file
+        for start_time, end_time in [(0, 1), (1.9, 2.2), (3, 17.5),
+                                     (0, None), (45, None)]:
+            for channels in [None, [0], [1], [1, 0]]:
+                for save_memory in [True, False]:
+                    self.checkWindow(channels=channels,
+                                     start_time=start_time,
+                                     end_time=end_time,
+                                     save_memory=save_memory)
+        self.assertGreater(self.cache.hits, 0)
+
+    def testSmallCache(self):
+        # blocks are dropped and decoded again when the cache is full
+        self.cache = BlockCache(max_bytes=60000, block_scans=5000)
+        self.cached_reader.setBlockCache(self.cache)
+        for _ in range(2):
+            self.checkWindow(start_time=0, end_time=None)
+        self.assertGreater(self.cache.evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import unittest
+
+import numpy as np
+
+from CODASReader import CODASReader
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+
+class ReadWindowsTest(unittest.TestCase):
+    """Windows read by readWindows match the same scans taken from the
+    whole ADC data, however the windows are grouped"""
+
+    def setUp(self):
+        self.reader = CODASReader(EXAMPLE_FILE)
+        self.time_between_samples = self.reader.getTimeBetweenSamples()
+        self.duration = self.reader._getScanCount() * self.time_between_samples
+
+    # builds the expected windows from the ADC data of the whole file
+    def getExpected(self, times, pre, post, channels, save_memory,
+                    pad_value):
+        adc_data = self.reader.getADC(channels,
+                                      save_memory=save_memory).adc_data
+        pre_scans = int(round(pre / self.time_between_samples))
+        samples = pre_scans + 1 + int(round(post / self.time_between_samples))
+        expected = np.full([len(times), samples, adc_data.shape[1]],
+                           pad_value, dtype=adc_data.dtype)
+        for window, time in enumerate(times):
+            first = int(np.rint(time / self.time_between_samples)) - pre_scans
+            for sample in range(samples):
+                if 0 <= first + sample < len(adc_data):
+                    expected[window, sample] = adc_data[first + sample]
+        return expected
+
+    def checkWindows(self, times, pre, post, channels=None,
+                     save_memory=True, pad_value=0,
+                     merge_bytes_values=(0, 1000, 256 * 1024, 1 << 30)):
+        expected = self.getExpected(times, pre, post, channels,
+                                    save_memory, pad_value)
+        for merge_bytes in merge_bytes_values:
+            windows = self.reader.readWindows(
+                times, pre, post, channels, save_memory, pad_value,
+                merge_bytes)
+            self.assertEqual(windows.dtype, expected.dtype)
+            np.testing.assert_array_equal(windows, expected,
+                                          "merge_bytes " + str(merge_bytes))
+
+    def testRandomWindows(self):
+        randomizer = np.random.default_rng(2000)
+        # unsorted centres, including windows past both edges of the data
+        # and windows entirely outside of it
+        times = randomizer.uniform(-2, self.duration + 2, 2000)
+        self.checkWindows(times, 0.05, 0.1)
+        self.checkWindows(times, 0.2, 0, channels=[1], pad_value=-1)
+        self.checkWindows(times[:300], 0.01, 0.02, channels=[1, 0],
+                          save_memory=False, pad_value=np.nan)
+
+    def testOverlappingAndLongWindows(self):
+        times = np.array([30, 0, self.duration, 30.01, 29.99, 45])
+        self.checkWindows(times, 1, 1)
+        # windows longer than a chunk of ADC data
+        self.checkWindows(times, 20, 20, save_memory=False,
+                          merge_bytes_values=(0, 1 << 30))
+
+    def testSingleTime(self):
+        np.testing.assert_array_equal(
+            self.reader.readWindows(10, 0.1, 0.1),
+            self.getExpected([10], 0.1, 0.1, None, True, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import gzip
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from CODASReader import CODASReader, CompressedFile, compressFile
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+
+class ReadAtTest(unittest.TestCase):
+    """Random reads from compressed files return the same bytes as the
+    uncompressed file"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(EXAMPLE_FILE, "rb") as example_file:
+            self.raw = example_file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def checkReads(self, location):
+        size = len(self.raw)
+        randomizer = random.Random(1156)
+        reads = [(randomizer.randrange(size), randomizer.randrange(1, 70000))
+                 for _ in range(200)]
+        # reads at both ends of the file and past its end
+        reads += [(0, 1156), (size - 10, 10), (size - 10, 100), (size, 10)]
+        with CompressedFile(location) as compressed:
+            self.assertEqual(compressed.size, size)
+            for offset, length in reads:
+                self.assertEqual(compressed.readAt(offset, length),
+                                 self.raw[offset:offset + length],
+                                 "offset " + str(offset))
+            # sequential reads continue the last decompression
+            compressed.seek(12345)
+            parts = [compressed.read(4096) for _ in range(50)]
+            self.assertEqual(b"".join(parts), self.raw[12345:12345 + 50 * 4096])
+
+    def testSingleMember(self):
+        location = os.path.join(self.directory.name, "example.WDQ.gz")
+        with open(location, "wb") as compressed_file:
+            compressed_file.write(gzip.compress(self.raw))
+        self.checkReads(location)
+
+    def testCompressFile(self):
+        location = compressFile(EXAMPLE_FILE, os.path.join(
+            self.directory.name, "example.WDQ.gz"), block_size=65536)
+        self.assertTrue(os.path.exists(location + ".idx"))
+        self.checkReads(location)
+        # the stored index is used when the file is opened again
+        self.checkReads(location)
+
+    def testReader(self):
+        location = compressFile(EXAMPLE_FILE, os.path.join(
+            self.directory.name, "example.WDQ.gz"), block_size=65536)
+        with CODASReader(EXAMPLE_FILE) as reader, \
+                CODASReader(location) as compressed_reader:
+            self.assertEqual(compressed_reader.header, reader.header)
+            self.assertEqual(compressed_reader.getADC(start_time=10,
+                                                      end_time=20)
+                             .adc_data.tolist(),
+                             reader.getADC(start_time=10, end_time=20)
+                             .adc_data.tolist())
+
+
+class IndexTest(unittest.TestCase):
+    """Indexes are only stored if they speed up reads and are not built
+    again when a reader is reopened"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(EXAMPLE_FILE, "rb") as example_file:
+            self.compressed = gzip.compress(example_file.read())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testSingleMemberIndexNotStored(self):
+        location = os.path.join(self.directory.name, "example.WDQ.gz")
+        with open(location, "wb") as compressed_file:
+            compressed_file.write(self.compressed)
+        with CODASReader(location) as reader:
+            reader.readTrailer()
+        self.assertFalse(os.path.exists(location + ".idx"))
+
+    def checkReopen(self, source):
+        reader = CODASReader(source)
+        expected = reader.getADC(start_time=10, end_time=20).adc_data
+        with mock.patch.object(CompressedFile, "_buildIndex") as build:
+            for _ in range(3):
+                with reader:
+                    adc_data = reader.getADC(start_time=10,
+                                             end_time=20).adc_data
+                    self.assertEqual(adc_data.tolist(), expected.tolist())
+        build.assert_not_called()
+
+    def testReopenFileObject(self):
+        self.checkReopen(io.BytesIO(self.compressed))
+
+    def testReopenLocation(self):
+        location = os.path.join(self.directory.name, "example.WDQ.gz")
+        with open(location, "wb") as compressed_file:
+            compressed_file.write(self.compressed)
+        self.checkReopen(location)
+
+
+if __name__ == "__main__":
+    unittest.main()
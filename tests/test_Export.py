@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from CODASReader import CODASReader
+from CODASReader import Export
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+CHUNK_SCANS = 10000
+
+
+# returns an _iterChunks replacement that stops the conversion with
+# KeyboardInterrupt after 'chunks' chunks were written
+def interruptAfter(chunks):
+    iter_chunks = Export._iterChunks
+
+    def interruptedChunks(*args, **kwargs):
+        for number, chunk in enumerate(iter_chunks(*args, **kwargs)):
+            if number == chunks:
+                raise KeyboardInterrupt
+            yield chunk
+    return interruptedChunks
+
+
+class ResumeConversionTest(unittest.TestCase):
+    """An interrupted conversion continued from its checkpoint gives
+    the same file as an uninterrupted conversion"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.reader = CODASReader(EXAMPLE_FILE)
+
+    def tearDown(self):
+        self.reader.close()
+        self.directory.cleanup()
+
+    def checkResume(self, convert):
+        complete = os.path.join(self.directory.name, "complete")
+        resumed = os.path.join(self.directory.name, "resumed")
+        convert(complete, chunk_size=CHUNK_SCANS)
+
+        with mock.patch.object(Export, "_iterChunks", interruptAfter(3)):
+            with self.assertRaises(KeyboardInterrupt):
+                convert(resumed, chunk_size=CHUNK_SCANS)
+        self.assertFalse(os.path.exists(resumed))
+        # data written after the last checkpoint has to be discarded, it
+        # is longer than the whole output so it is not simply overwritten
+        with open(resumed + ".partial", "ab") as partial:
+            partial.write(b"\x00junk after the checkpoint\n"
+                          * (os.path.getsize(complete) // 10))
+
+        finished_scans = []
+        iter_chunks = Export._iterChunks
+
+        def countedChunks(*args, **kwargs):
+            for finished, data in iter_chunks(*args, **kwargs):
+                finished_scans.append(finished)
+                yield finished, data
+        with mock.patch.object(Export, "_iterChunks", countedChunks):
+            convert(resumed, chunk_size=CHUNK_SCANS)
+        # the first three chunks are not converted again
+        self.assertEqual(finished_scans[0], 4 * CHUNK_SCANS)
+
+        with open(complete, "rb") as complete_file, \
+                open(resumed, "rb") as resumed_file:
+            self.assertEqual(complete_file.read(), resumed_file.read())
+        self.assertFalse(os.path.exists(resumed + ".partial"))
+        self.assertFalse(os.path.exists(resumed + ".checkpoint"))
+
+    def testResumeCSV(self):
+        self.checkResume(self.reader.convertADCsToCSV)
+
+    def testResumeBinary(self):
+        self.checkResume(self.reader.convertADCsToBinary)
+
+    def testChangedArgumentsStartAgain(self):
+        name = os.path.join(self.directory.name, "output")
+        with mock.patch.object(Export, "_iterChunks", interruptAfter(3)):
+            with self.assertRaises(KeyboardInterrupt):
+                self.reader.convertADCsToBinary(name, chunk_size=CHUNK_SCANS)
+        self.reader.convertADCsToBinary(name, dtype="float32",
+                                        chunk_size=CHUNK_SCANS)
+        self.assertEqual(os.path.getsize(name),
+                         4 * self.reader.acq_channels
+                         * self.reader._getScanCount())
+
+    def testChangedInputStartsAgain(self):
+        location = os.path.join(self.directory.name, "input.WDQ")
+        name = os.path.join(self.directory.name, "output")
+        with open(EXAMPLE_FILE, "rb") as example_file:
+            raw = bytearray(example_file.read())
+        with open(location, "wb") as input_file:
+            input_file.write(raw)
+        with mock.patch.object(Export, "_iterChunks", interruptAfter(3)):
+            with self.assertRaises(KeyboardInterrupt):
+                CODASReader(location).convertADCsToBinary(
+                    name, chunk_size=CHUNK_SCANS)
+        # rewriting the input with other ADC data of the same size
+        header_size = CODASReader(location).header[4]
+        raw[header_size:header_size + 8 * CHUNK_SCANS] = bytes(
+            8 * CHUNK_SCANS)
+        with open(location, "r+b") as input_file:
+            input_file.write(raw)
+        status = os.stat(location)
+        os.utime(location, ns=(status.st_atime_ns,
+                               status.st_mtime_ns + 10 ** 9))
+        reader = CODASReader(location)
+        reader.convertADCsToBinary(name, chunk_size=CHUNK_SCANS)
+        expected = os.path.join(self.directory.name, "expected")
+        reader.convertADCsToBinary(expected, chunk_size=CHUNK_SCANS)
+        with open(expected, "rb") as expected_file, \
+                open(name, "rb") as output_file:
+            self.assertEqual(output_file.read(), expected_file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import unittest
+
+from CODASReader import CODASReader
+from CODASReader.Frames import getChannelNames
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class ChannelNamesTest(unittest.TestCase):
+    """Channel names are taken from the trailer without changing the
+    reader"""
+
+    def setUp(self):
+        self.reader = CODASReader(EXAMPLE_FILE)
+
+    def testTrailerNotStored(self):
+        self.assertEqual(getChannelNames(self.reader),
+                         ["Central", "channel 1"])
+        self.assertEqual(self.reader.trailer, [])
+        self.assertEqual(getChannelNames(self.reader, [1]), ["channel 1"])
+
+    def testReadTrailer(self):
+        self.reader.readTrailer()
+        trailer = self.reader.trailer
+        self.assertEqual(getChannelNames(self.reader),
+                         ["Central", "channel 1"])
+        self.assertIs(self.reader.trailer, trailer)
+
+    @unittest.skipIf(pandas is None, "requires pandas")
+    def testDataFrame(self):
+        data_frame = self.reader.toDataFrame(end_time=1)
+        self.assertEqual(list(data_frame.columns), ["Central", "channel 1"])
+        self.assertEqual(self.reader.trailer, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
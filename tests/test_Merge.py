@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from CODASReader import CODASReader, iterMergedADC, mergeADCsToCSV
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+SHIFT_SCANS = 5
+
+
+class MergeTest(unittest.TestCase):
+    """Merging the example file with a copy that started later gives the
+    data of both offset by the difference of their start times"""
+
+    def setUp(self):
+        self.reader = CODASReader(EXAMPLE_FILE)
+        self.shifted = CODASReader(EXAMPLE_FILE)
+        self.time_between_samples = self.reader.header[12]
+        self.adc_data = self.reader.getADC().adc_data
+
+    # moves the start of the copy 'scans' scans after the start of the
+    # original
+    def shiftStart(self, scans):
+        self.shifted.header[13] = (self.reader.header[13]
+                                   + scans * self.time_between_samples)
+
+    def merge(self, method, chunk_size):
+        chunks = list(iterMergedADC([self.reader, self.shifted],
+                                    method=method, chunk_size=chunk_size))
+        firsts = [first for first, _ in chunks]
+        lengths = [len(adc_data) for _, adc_data in chunks]
+        # the chunks follow each other without gaps
+        self.assertEqual(firsts, np.cumsum([0] + lengths[:-1]).tolist())
+        return np.concatenate([adc_data for _, adc_data in chunks])
+
+    def testNearest(self):
+        self.shiftStart(SHIFT_SCANS)
+        for chunk_size in [1000, 4099, 65536]:
+            merged = self.merge("nearest", chunk_size)
+            self.assertEqual(merged.dtype, np.int16)
+            scans = len(merged)
+            self.assertGreaterEqual(scans,
+                                    len(self.adc_data) - SHIFT_SCANS - 1)
+            # the original is offset by the shift, the copy starts with
+            # the merged data
+            np.testing.assert_array_equal(
+                merged[:, :2],
+                self.adc_data[SHIFT_SCANS:SHIFT_SCANS + scans])
+            np.testing.assert_array_equal(merged[:, 2:],
+                                          self.adc_data[:scans])
+
+    def testLinearHalfSample(self):
+        self.shiftStart(SHIFT_SCANS + 0.5)
+        for chunk_size in [1000, 65536]:
+            merged = self.merge("linear", chunk_size)
+            scans = len(merged)
+            np.testing.assert_array_equal(merged[:, 2:],
+                                          self.adc_data[:scans])
+            # the original is sampled halfway between two of its scans.
+            # The start times in seconds since epoch are only exact to
+            # a small part of a scan, which limits the exactness
+            before = self.adc_data[SHIFT_SCANS:SHIFT_SCANS + scans]
+            after = self.adc_data[SHIFT_SCANS + 1:SHIFT_SCANS + 1 + scans]
+            self.assertEqual(len(after), scans)
+            midpoints = (before.astype(float) + after) / 2
+            self.assertTrue(np.all(np.abs(merged[:, :2] - midpoints)
+                                   <= 1e-3 * np.abs(after - before.astype(
+                                       float)) + 1e-9))
+
+    def testCSV(self):
+        self.shiftStart(SHIFT_SCANS)
+        with tempfile.TemporaryDirectory() as directory:
+            outputs = []
+            for chunk_size in [1000, 65536]:
+                name = os.path.join(directory, str(chunk_size) + ".csv")
+                mergeADCsToCSV([self.reader, self.shifted], name,
+                               chunk_size=chunk_size)
+                with open(name, "r") as file:
+                    outputs.append(file.read())
+        self.assertEqual(outputs[0], outputs[1])
+        lines = outputs[0].splitlines()
+        self.assertEqual(lines[1], "#,0:0,0:1,1:0,1:1,")
+        values = np.array([line.split(",")[1:5] for line in lines[3:]],
+                          dtype=np.int16)
+        np.testing.assert_array_equal(values, self.merge("nearest", 65536))
+
+
+if __name__ == "__main__":
+    unittest.main()
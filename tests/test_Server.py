@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from CODASReader import CODASReader, CODASServer
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+
+class ServerTest(unittest.TestCase):
+    """The server keeps a limited number of files open and opens new
+    files without blocking requests for other files"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for number in range(5):
+            shutil.copy(EXAMPLE_FILE, os.path.join(
+                self.directory.name, str(number) + ".WDQ"))
+        self.server = CODASServer(self.directory.name, ("127.0.0.1", 0),
+                                  max_readers=2)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def request(self, path):
+        url = "http://127.0.0.1:" + str(self.server.server_address[1]) + path
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return json.load(response)
+
+    # returns whether each reader is closed. A dropped reader is closed
+    # once its last request is finished, which may be shortly after the
+    # response was received
+    def getClosed(self, readers, expected):
+        deadline = time.monotonic() + 10
+        while True:
+            closed = [reader._file_descriptor is None for reader in readers]
+            if closed == expected or time.monotonic() > deadline:
+                return closed
+            time.sleep(0.01)
+
+    def testLeastRecentlyUsedReadersAreClosed(self):
+        readers = []
+        for number in range(5):
+            self.request("/metadata?file=" + str(number) + ".WDQ")
+            readers.append(self.server._readers[os.path.join(
+                os.path.realpath(self.directory.name),
+                str(number) + ".WDQ")]["reader"])
+        self.assertEqual(len(self.server._readers), 2)
+        expected = [True, True, True, False, False]
+        self.assertEqual(self.getClosed(readers, expected), expected)
+        # the reader of a deleted file is closed with its next request
+        os.remove(readers[4].location)
+        with self.assertRaises(urllib.error.HTTPError):
+            self.request("/metadata?file=4.WDQ")
+        self.assertEqual(self.getClosed(readers[4:], [True]), [True])
+        self.assertEqual(len(self.server._readers), 1)
+
+    def testOpeningDoesNotBlockOtherFiles(self):
+        self.request("/metadata?file=0.WDQ")
+        opening = threading.Event()
+        finish = threading.Event()
+        read_trailer = CODASReader.readTrailer
+
+        # reading the trailer of 1.WDQ waits until the other request
+        # was answered
+        def slowReadTrailer(reader):
+            if reader.location.endswith("1.WDQ"):
+                opening.set()
+                finish.wait(30)
+            return read_trailer(reader)
+        with mock.patch.object(CODASReader, "readTrailer", slowReadTrailer):
+            slow_request = threading.Thread(
+                target=self.request, args=("/metadata?file=1.WDQ",))
+            slow_request.start()
+            try:
+                self.assertTrue(opening.wait(30))
+                # answered while 1.WDQ is still being opened
+                header = self.request("/header?file=0.WDQ")
+                self.assertTrue(slow_request.is_alive())
+            finally:
+                finish.set()
+                slow_request.join()
+        self.assertEqual(len(header), 63)
+
+
+if __name__ == "__main__":
+    unittest.main()
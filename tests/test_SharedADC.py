@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import unittest
+
+import numpy as np
+
+from CODASReader import CODASReader
+from CODASReader.SharedADC import _attachSharedMemory
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+
+
+# attaches to the data in a worker process, checks that it cannot be
+# closed while the array is in use and returns the sum of each column
+def sumColumns(handle):
+    data = handle.attach()
+    sums = data.sum(axis=0, dtype=np.int64).tolist()
+    try:
+        handle.close()
+        closed_in_use = True
+    except BufferError:
+        closed_in_use = False
+    del data
+    handle.close()
+    return sums, closed_in_use
+
+
+class SharedADCTest(unittest.TestCase):
+    """Shared ADC data can be used by a pool of processes and is never
+    unmapped while arrays still use it"""
+
+    def setUp(self):
+        self.reader = CODASReader(EXAMPLE_FILE)
+        self.expected = self.reader.getADC().adc_data.sum(
+            axis=0, dtype=np.int64).tolist()
+
+    def checkPool(self, handle):
+        with multiprocessing.Pool(2) as pool:
+            results = pool.map(sumColumns, [handle] * 4)
+        for sums, closed_in_use in results:
+            self.assertEqual(sums, self.expected)
+            # memory maps stay valid after close, shared memory does not
+            self.assertEqual(closed_in_use, handle.backend == "memmap")
+
+    def testSharedMemory(self):
+        handle = self.reader.readADCShared()
+        self.checkPool(handle)
+        data = handle.attach()
+        with self.assertRaises(BufferError):
+            handle.close()
+        # the block is unlinked even though it is still mapped here
+        with self.assertRaises(BufferError):
+            handle.unlink()
+        with self.assertRaises(FileNotFoundError):
+            _attachSharedMemory(handle.name)
+        # the array stays usable until it is deleted
+        self.assertEqual(data.sum(axis=0, dtype=np.int64).tolist(),
+                         self.expected)
+        del data
+        handle.close()
+
+    def testContextManager(self):
+        with self.reader.readADCShared() as handle:
+            self.checkPool(handle)
+        with self.assertRaises(FileNotFoundError):
+            _attachSharedMemory(handle.name)
+
+    def testMemoryMap(self):
+        handle = self.reader.readADCShared(backend="memmap")
+        self.checkPool(handle)
+        data = handle.attach()
+        handle.unlink()
+        self.assertFalse(os.path.exists(handle.name))
+        self.assertEqual(data.sum(axis=0, dtype=np.int64).tolist(),
+                         self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from CODASReader import verifyFile, verifyFiles
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(__file__), os.pardir, "Examples",
+                            "ExampleFiles", "20190923-T1.WDQ")
+# byte offsets in the header of the example file
+ADC_BYTES_OFFSET = 8
+FLAGS_OFFSET = 100
+CHANNEL_INFO_OFFSET = 110
+CHANNEL_INFO_SIZE = 36
+DIVISOR_OFFSET = 31
+HEADER_SIZE = 1156
+ADC_DATA_BYTES = 576000
+
+
+class VerifyTest(unittest.TestCase):
+    """verifyFile finds truncated and corrupted copies of the example
+    file"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(EXAMPLE_FILE, "rb") as example_file:
+            self.raw = example_file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # writes a copy of the example file with 'data' written at each
+    # offset of 'patches' and returns its location
+    def writeCopy(self, name, patches={}, size=None):
+        data = bytearray(self.raw[:size])
+        for offset, patch in patches.items():
+            data[offset:offset + len(patch)] = patch
+        location = os.path.join(self.directory.name, name)
+        with open(location, "wb") as copy:
+            copy.write(data)
+        return location
+
+    def checkErrors(self, location, message):
+        report = verifyFile(location)
+        self.assertFalse(report["ok"])
+        self.assertTrue(any(message in error for error in report["errors"]),
+                        report["errors"])
+        return report
+
+    def testExample(self):
+        report = verifyFile(EXAMPLE_FILE)
+        self.assertTrue(report["ok"], report)
+        self.assertEqual(report["expected_bytes"], len(self.raw))
+
+    def testTruncated(self):
+        for size in [HEADER_SIZE + ADC_DATA_BYTES // 2, len(self.raw) - 1]:
+            report = self.checkErrors(
+                self.writeCopy("truncated.WDQ", size=size),
+                "File is truncated")
+            self.assertEqual(report["bytes_in_file"], size)
+        for size in [0, 4, HEADER_SIZE // 2]:
+            self.checkErrors(self.writeCopy("truncated.WDQ", size=size),
+                             "could not be")
+
+    def testControlWord(self):
+        self.checkErrors(
+            self.writeCopy("control.WDQ", {HEADER_SIZE - 2: b"\0\0"}),
+            "control byte")
+
+    def testMarkerPointer(self):
+        # the first event marker pointer directly follows the ADC data
+        self.checkErrors(
+            self.writeCopy("marker.WDQ", {HEADER_SIZE + ADC_DATA_BYTES:
+                                          struct.pack("<l", 200000)}),
+            "Event marker pointer 200000")
+
+    def testPartialScan(self):
+        self.checkErrors(
+            self.writeCopy("scan.WDQ", {ADC_BYTES_OFFSET:
+                                        struct.pack("<L", 575999)}),
+            "not a whole number of scans")
+
+    def testPackedDivisors(self):
+        # a packed copy in which every channel is stored at full rate,
+        # the example file is not packed and has divisors of 0.
+        # In packed files header[5] counts the data points before
+        # packing instead of bytes
+        flags = struct.unpack_from("<H", self.raw, FLAGS_OFFSET)[0]
+        packed = {FLAGS_OFFSET: struct.pack("<H", flags | 1 << 14),
+                  ADC_BYTES_OFFSET: struct.pack("<L", ADC_DATA_BYTES // 2)}
+        for channel in range(2):
+            packed[CHANNEL_INFO_OFFSET + channel * CHANNEL_INFO_SIZE
+                   + DIVISOR_OFFSET] = b"\1"
+        divisor = (CHANNEL_INFO_OFFSET + CHANNEL_INFO_SIZE
+                   + DIVISOR_OFFSET)
+        self.assertTrue(verifyFile(self.writeCopy("packed.WDQ",
+                                                  packed))["ok"])
+        self.checkErrors(
+            self.writeCopy("packed.WDQ", {**packed, divisor: b"\xff"}),
+            "Invalid sample rate divisor for channel 1: -1")
+        self.checkErrors(
+            self.writeCopy("packed.WDQ", {**packed, divisor: b"\0"}),
+            "sample rate divisor of 0")
+
+    def testVerifyFiles(self):
+        locations = [EXAMPLE_FILE,
+                     self.writeCopy("truncated.WDQ", size=HEADER_SIZE + 10),
+                     self.writeCopy("control.WDQ",
+                                    {HEADER_SIZE - 2: b"\0\0"}),
+                     os.path.join(self.directory.name, "missing.WDQ")]
+        expected = [verifyFile(location) for location in locations]
+        self.assertEqual([report["ok"] for report in expected],
+                         [True, False, False, False])
+        for processes in [False, True]:
+            self.assertEqual(list(verifyFiles(iter(locations), workers=2,
+                                              processes=processes)),
+                             expected)
+
+
+if __name__ == "__main__":
+    unittest.main()